@@ -0,0 +1,106 @@
+"""Benchmark : moteur d'indicateurs vs recalcul pandas naïf (barres 1m sur 5 ans)
+
+Usage : python benchmarks/bench_indicators.py [--bars N] [--updates K]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker.indicators import IndicatorEngine  # noqa: E402
+
+BARS_5Y_1M = 5 * 252 * 390
+
+
+def make_history(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 70000 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    index = pd.date_range('2021-01-04 09:00', periods=n, freq='min', tz='Asia/Seoul')
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.0005, n) * close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(100, 10000, n).astype(float),
+    }, index=index)
+
+
+def naive_pandas(hist):
+    """Approche actuelle généralisée : chaque indicateur recalculé sur toute la fenêtre"""
+    close = hist['Close']
+    out = pd.DataFrame(index=hist.index)
+    out['SMA 20'] = close.rolling(20).mean()
+    out['SMA 50'] = close.rolling(50).mean()
+    out['EMA 20'] = close.ewm(span=20, adjust=False).mean()
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    out['RSI 14'] = 100 - 100 / (1 + gain / loss)
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    out['MACD'] = macd
+    out['MACD signal'] = macd.ewm(span=9, adjust=False).mean()
+    mid = close.rolling(20).mean()
+    sd = close.rolling(20).std(ddof=0)
+    out['BB upper'], out['BB lower'] = mid + 2 * sd, mid - 2 * sd
+    prev = close.shift()
+    tr = pd.concat([hist['High'] - hist['Low'], (hist['High'] - prev).abs(), (hist['Low'] - prev).abs()],
+                   axis=1).max(axis=1)
+    out['ATR 14'] = tr.ewm(alpha=1 / 14, adjust=False).mean()
+    tp = (hist['High'] + hist['Low'] + hist['Close']) / 3
+    day = hist.index.normalize()
+    out['VWAP'] = (tp * hist['Volume']).groupby(day).cumsum() / hist['Volume'].groupby(day).cumsum()
+    return out
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, default=BARS_5Y_1M)
+    parser.add_argument('--updates', type=int, default=20)
+    args = parser.parse_args()
+
+    hist = make_history(args.bars + args.updates)
+    base = hist.iloc[:args.bars]
+    print(f"Barres : {args.bars:,} (1m), nouvelles barres : {args.updates}")
+
+    t_naive = timed(lambda: naive_pandas(base))
+    t_full = timed(lambda: IndicatorEngine().compute('BENCH', '1m', base))
+    print(f"Calcul complet  - pandas naïf : {t_naive * 1e3:9.1f} ms")
+    print(f"Calcul complet  - moteur      : {t_full * 1e3:9.1f} ms")
+
+    # Arrivée barre par barre : recalcul complet vs mise à jour incrémentale
+    start = time.perf_counter()
+    for k in range(1, args.updates + 1):
+        naive_pandas(hist.iloc[:args.bars + k])
+    t_naive_bar = (time.perf_counter() - start) / args.updates
+
+    engine = IndicatorEngine()
+    engine.compute('BENCH', '1m', base)
+    frames = [hist.iloc[:args.bars + k] for k in range(1, args.updates + 1)]
+    start = time.perf_counter()
+    for frame in frames:
+        engine.compute('BENCH', '1m', frame)
+    t_inc_bar = (time.perf_counter() - start) / args.updates
+
+    print(f"Nouvelle barre  - pandas naïf : {t_naive_bar * 1e3:9.2f} ms/barre")
+    print(f"Nouvelle barre  - incrémental : {t_inc_bar * 1e3:9.2f} ms/barre "
+          f"(dont reconstruction du DataFrame de sortie)")
+    print(f"Mises à jour incrémentales : {engine.incremental_updates}, recalculs complets : {engine.full_computes}")
+
+
+if __name__ == '__main__':
+    main()
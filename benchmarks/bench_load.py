@@ -0,0 +1,264 @@
+"""Benchmark de charge : sessions Streamlit simulées (AppTest) contre un yfinance local et déterministe
+
+Chaque session rejoue un parcours type : ouverture, changement de symbole,
+changement de période, ouverture de sections, puis actualisation automatique
+(chaque rerun complet tient lieu de tick, AppTest ne déclenchant pas les
+fragments ``run_every``). Toutes les sessions restent ouvertes dans le même
+processus et partagent donc les caches ``st.cache_*``, le hub de prix et le
+gouverneur, comme les spectateurs d'un même serveur.
+
+Les reruns des sessions sont entrelacés (une étape de chaque session à tour de
+rôle) dans un seul thread : AppTest n'est pas thread-safe (compilation du script
+et état des widgets). Les threads de fond de l'application (planificateur, pool
+de téléchargement) tournent, eux, en parallèle. Les latences mesurées sont donc
+des temps de service par rerun, sans file d'attente côté serveur.
+
+Une première session seule mesure le démarrage à froid ; les autres forment la
+phase de charge. Mesures rapportées : latence des reruns (p50/p95), appels
+amont (``yfinance_calls_total`` et requêtes HTTP simulées), mémoire résidente
+par session et taux de succès des caches.
+
+Le gouverneur de requêtes garde ses réglages de production ; ``--yf-rate`` et
+``--yf-burst`` les remplacent pour mesurer l'application sans le bridage amont.
+
+Usage : python benchmarks/bench_load.py [--sessions 50] [--watchlist 200]
+        [--latency-ms 50] [--refreshes 3] [--yf-rate R --yf-burst B]
+        [--json resultats.json] [--budget-p95-ms MS]
+Code de sortie 1 en cas d'exception dans l'application ou si le p95 dépasse le budget.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD = os.path.join(ROOT, 'Dashboard.py')
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from tracker import metrics  # noqa: E402
+
+HOME_SECTION = "📈 Tableau de bord"
+SECTIONS = ["💰 Portefeuille virtuel", "🔔 Alertes de prix", "📤 Export des données",
+            "🤖 Prédictions ML", "🇰🇷 Indices KOSPI & KOSDAQ", "🔗 Corrélations & risque"]
+PERIODS = ["3mo", "6mo", "1y", "2y"]
+BASE_WATCHLIST = ["005930.KS", "000660.KS", "207940.KS", "005380.KS", "035420.KS"]
+
+
+def synthetic_watchlist(size):
+    """Liste de suivi de ``size`` symboles : les valeurs par défaut, complétées de codes KRX fictifs"""
+    extra = [f"{100000 + i:06d}.KS" for i in range(max(0, size - len(BASE_WATCHLIST)))]
+    return (BASE_WATCHLIST + extra)[:size]
+
+
+def rss_bytes():
+    """Mémoire résidente courante du processus (pic sur les systèmes sans /proc)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def cache_counts():
+    """{cache: (hits, misses)} lus sur les jauges exportées par le tableau de bord"""
+    counts = {}
+    for name, labels, value in metrics.REGISTRY.gauges():
+        if 'cache' in labels and name in ('cache_hits', 'cache_misses'):
+            hits, misses = counts.get(labels['cache'], (0, 0))
+            counts[labels['cache']] = (hits + value, misses) if name == 'cache_hits' else (hits, misses + value)
+    return counts
+
+
+def counter_totals(prefix):
+    totals = {}
+    for (name, labels), value in metrics.REGISTRY.counters().items():
+        if name.startswith(prefix):
+            key = name + ''.join(f'[{v}]' for _, v in labels)
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def diff(after, before):
+    return {k: v - before.get(k, 0) for k, v in after.items() if v - before.get(k, 0)}
+
+
+class Recorder:
+    """Durées des reruns par action et exceptions levées par le script"""
+
+    def __init__(self):
+        self.samples = []
+        self.errors = []
+
+    def step(self, at, action):
+        start = time.perf_counter()
+        at.run()
+        self.samples.append((action, (time.perf_counter() - start) * 1000))
+        self.errors.extend(f"{action}: {e.value}" for e in at.exception)
+
+
+def widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def session(index, args, watchlist, recorder):
+    """Parcours type d'un spectateur, une étape (un rerun) par ``next`` ; produit l'AppTest"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(args.seed + index)
+    at = AppTest.from_file(DASHBOARD, default_timeout=args.timeout)
+    if watchlist:
+        at.session_state['watchlist'] = list(watchlist)
+    recorder.step(at, 'open')
+    yield at
+
+    widget(at.sidebar.selectbox, "Symbole principal").set_value(rng.choice(at.session_state.watchlist))
+    recorder.step(at, 'switch_symbol')
+    yield at
+    widget(at.sidebar.selectbox, "Période").set_value(rng.choice(PERIODS))
+    recorder.step(at, 'change_period')
+    yield at
+
+    for label in rng.sample(SECTIONS, args.sections):
+        at.sidebar.radio[0].set_value(label)
+        recorder.step(at, 'section')
+        yield at
+    at.sidebar.radio[0].set_value(HOME_SECTION)
+    widget(at.sidebar.checkbox, "Actualisation automatique").check()
+    for _ in range(args.refreshes):
+        recorder.step(at, 'auto_refresh')
+        yield at
+
+
+def run_interleaved(sessions):
+    """Fait avancer les sessions à tour de rôle ; renvoie le dernier AppTest de chacune"""
+    apps = [None] * len(sessions)
+    active = list(enumerate(sessions))
+    while active:
+        for item in list(active):
+            i, steps = item
+            try:
+                apps[i] = next(steps)
+            except StopIteration:
+                active.remove(item)
+    return apps
+
+
+def percentiles(values):
+    return {'n': len(values), 'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)), 'max_ms': float(max(values))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--watchlist', type=int, default=0,
+                        help="taille de la liste de suivi de chaque session (0 : liste par défaut)")
+    parser.add_argument('--latency-ms', type=float, default=50, help="latence simulée par requête amont")
+    parser.add_argument('--sections', type=int, default=3, help="sections ouvertes par session")
+    parser.add_argument('--refreshes', type=int, default=3, help="reruns en actualisation automatique")
+    parser.add_argument('--yf-rate', type=float, help="débit du gouverneur (requêtes/s), TRACKER_YF_RATE")
+    parser.add_argument('--yf-burst', type=int, help="rafale du gouverneur, TRACKER_YF_BURST")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--budget-p95-ms', type=float, default=None)
+    parser.add_argument('--json', help="écrit les résultats dans ce fichier (suivi des régressions)")
+    args = parser.parse_args()
+
+    # Caches disque isolés, gouverneur et yfinance configurés avant le premier import de tracker.governor
+    os.environ['TRACKER_CACHE_DIR'] = tempfile.mkdtemp(prefix='tracker-bench-')
+    if args.yf_rate:
+        os.environ['TRACKER_YF_RATE'] = str(args.yf_rate)
+    if args.yf_burst:
+        os.environ['TRACKER_YF_BURST'] = str(args.yf_burst)
+    # Sans serveur, chaque lecture de cache hors session avertit « No runtime found »
+    os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')
+    from benchmarks import yfinance_stub
+    from streamlit import logger as streamlit_logger
+    streamlit_logger.set_log_level('error')
+    stub = yfinance_stub.install(latency=args.latency_ms / 1000)
+    watchlist = synthetic_watchlist(args.watchlist) if args.watchlist else None
+
+    cold = Recorder()
+    cold_start = time.perf_counter()
+    run_interleaved([session(0, args, watchlist, cold)])
+    cold_ms = (time.perf_counter() - cold_start) * 1000
+    gc.collect()
+
+    calls_before, governor_before = counter_totals('yfinance_calls'), counter_totals('governor_')
+    stub_before, caches_before = dict(stub.requests), cache_counts()
+    rss_before = rss_bytes()
+
+    load = Recorder()
+    start = time.perf_counter()
+    sessions = run_interleaved([session(i, args, watchlist, load) for i in range(1, args.sessions + 1)])
+    wall = time.perf_counter() - start
+    gc.collect()
+    rss_after = rss_bytes()
+
+    calls = diff(counter_totals('yfinance_calls'), calls_before)
+    http = diff(stub.requests, stub_before)
+    governor = diff(counter_totals('governor_'), governor_before)
+    caches = {}
+    for cache, (hits, misses) in cache_counts().items():
+        hits0, misses0 = caches_before.get(cache, (0, 0))
+        hits, misses = hits - hits0, misses - misses0
+        caches[cache] = {'hits': hits, 'misses': misses,
+                         'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None}
+    by_action = {}
+    for action, ms in load.samples:
+        by_action.setdefault(action, []).append(ms)
+    result = {
+        'config': vars(args),
+        'cold_session': {'total_ms': cold_ms, 'open_ms': cold.samples[0][1], 'errors': cold.errors},
+        'reruns': percentiles([ms for _, ms in load.samples]),
+        'actions': {action: percentiles(values) for action, values in by_action.items()},
+        'wall_s': wall,
+        'yfinance_calls': calls,
+        'upstream_http_requests': http,
+        'governor': governor,
+        'memory_per_session_bytes': (rss_after - rss_before) / max(1, len(sessions)),
+        'demo_fallbacks': sum(1 for at in sessions if at.session_state.demo_mode),
+        'caches': caches,
+        'errors': sorted(set(load.errors + cold.errors)),
+    }
+
+    reruns = result['reruns']
+    print(f"Sessions simultanées : {args.sessions} · watchlist "
+          f"{len(watchlist) if watchlist else len(BASE_WATCHLIST)} symboles · latence amont {args.latency_ms:g} ms")
+    print(f"Session à froid : ouverture {result['cold_session']['open_ms']:,.0f} ms, parcours {cold_ms:,.0f} ms")
+    print(f"Reruns : {reruns['n']} en {wall:,.1f} s · p50 {reruns['p50_ms']:,.0f} ms · "
+          f"p95 {reruns['p95_ms']:,.0f} ms · max {reruns['max_ms']:,.0f} ms")
+    for action, stats in result['actions'].items():
+        print(f"  {action:<15} n={stats['n']:<5} p50 {stats['p50_ms']:>7,.0f} ms   p95 {stats['p95_ms']:>7,.0f} ms")
+    total_calls = sum(calls.values())
+    print(f"\nAppels yfinance : {total_calls} ({total_calls / args.sessions:.2f} par session) "
+          + ' '.join(f"{k}={v}" for k, v in sorted(calls.items())))
+    print("Requêtes HTTP simulées :", ' '.join(f"{k}={v}" for k, v in sorted(http.items())) or '0')
+    print("Gouverneur :", ' '.join(f"{k}={v}" for k, v in sorted(governor.items())) or 'aucune attente')
+    print(f"Mémoire : {result['memory_per_session_bytes'] / 1024:,.0f} Ko de RSS par session "
+          f"({(rss_after - rss_before) / 2**20:,.1f} Mo pour {len(sessions)})")
+    if result['demo_fallbacks']:
+        print(f"Sessions basculées en mode démo : {result['demo_fallbacks']}")
+    print("\nCaches (phase de charge) :")
+    for cache, stats in caches.items():
+        rate = '—' if stats['hit_rate'] is None else f"{stats['hit_rate'] * 100:.1f} %"
+        print(f"  {cache:<16} hits {stats['hits']:>6}  misses {stats['misses']:>6}  succès {rate}")
+    if result['errors']:
+        print("\nErreurs :", *result['errors'][:20], sep='\n  ')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    over_budget = args.budget_p95_ms is not None and reruns['p95_ms'] > args.budget_p95_ms
+    return 1 if result['errors'] or over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Benchmark : mémoire par barre et coût d'un hit de cache, DataFrame pandas contre ``OHLCVBars``
+
+``st.cache_data`` sérialise la valeur renvoyée et la désérialise à chaque hit.
+On compare donc, sur des historiques simulés (``tracker.demo``, sans réseau) :
+
+- la mémoire résidente par barre (``memory_usage(deep=True)`` contre ``nbytes``) ;
+- la taille sérialisée stockée dans le cache ;
+- le coût d'un hit : ``pickle.loads`` du DataFrame, contre ``pickle.loads`` des
+  barres suivi de ``to_frame()`` (le DataFrame remis au graphique).
+
+Le DataFrame de référence reproduit celui de yfinance : colonnes float64,
+Dividends et Splits comprises, index UTC.
+
+Usage : python benchmarks/bench_ohlcv_memory.py [--symbol 005930.KS] [--watchlist N] [--repeat R]
+"""
+import argparse
+import os
+import pickle
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tracker.bars import OHLCVBars  # noqa: E402
+from tracker.demo import demo_history  # noqa: E402
+from tracker.ohlcv_store import to_utc_index  # noqa: E402
+
+# (période, intervalle) : journalier long, intraday du graphique, intraday dense
+CASES = [('5y', '1d'), ('max', '1d'), ('5d', '1m'), ('1mo', '1m')]
+
+
+def yfinance_frame(symbol, period, interval):
+    """Historique tel que le chemin actuel le met en cache (colonnes et dtypes de yfinance)"""
+    df = to_utc_index(demo_history(symbol, period, interval)).astype('float64')
+    df['Dividends'] = 0.0
+    df['Splits'] = 0.0
+    return df
+
+
+def best_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples), statistics.median(samples)
+
+
+def measure(df, repeat):
+    bars = OHLCVBars.from_frame(df)
+    df_blob = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    bars_blob = pickle.dumps(bars, protocol=pickle.HIGHEST_PROTOCOL)
+    return {
+        'bars': len(bars),
+        'df_bytes': int(df.memory_usage(deep=True).sum()),
+        'bars_bytes': bars.nbytes,
+        'df_pickle': len(df_blob),
+        'bars_pickle': len(bars_blob),
+        'df_hit_ms': best_ms(lambda: pickle.loads(df_blob), repeat),
+        'bars_hit_ms': best_ms(lambda: pickle.loads(bars_blob).to_frame(), repeat),
+        'to_frame_ms': best_ms(bars.to_frame, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbol', default='005930.KS')
+    parser.add_argument('--watchlist', type=int, default=20,
+                        help="nombre de symboles gardés en cache pour l'estimation globale")
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    header = (f"{'cas':<10} {'barres':>8} {'o/barre df':>11} {'o/barre bars':>13} "
+              f"{'pickle df':>10} {'pickle bars':>12} {'hit df ms':>10} {'hit bars ms':>12} {'to_frame ms':>12}")
+    print(header)
+    print('-' * len(header))
+    results = {}
+    for period, interval in CASES:
+        r = measure(yfinance_frame(args.symbol, period, interval), args.repeat)
+        results[(period, interval)] = r
+        n = max(r['bars'], 1)
+        print(f"{period + '/' + interval:<10} {r['bars']:>8,} {r['df_bytes'] / n:>11.1f} {r['bars_bytes'] / n:>13.1f} "
+              f"{r['df_pickle'] / 1024:>8,.0f}Ko {r['bars_pickle'] / 1024:>10,.0f}Ko "
+              f"{r['df_hit_ms'][1]:>10.3f} {r['bars_hit_ms'][1]:>12.3f} {r['to_frame_ms'][1]:>12.3f}")
+
+    # Une entrée de cache par symbole de la liste de suivi, sur l'historique intraday le plus dense
+    dense = results[CASES[-1]]
+    print(f"\nListe de suivi de {args.watchlist} symboles en {CASES[-1][0]}/{CASES[-1][1]} : "
+          f"{args.watchlist * dense['df_pickle'] / 2**20:,.1f} Mo (DataFrame) contre "
+          f"{args.watchlist * dense['bars_pickle'] / 2**20:,.1f} Mo (OHLCVBars) dans st.cache_data")
+    print("Temps des hits : médiane sur", args.repeat, "répétitions ; hit bars = pickle.loads + to_frame()")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Benchmark : démarrage à froid de Dashboard.py (time-to-first-paint) et coût d'import par module
+
+Chaque mesure tourne dans un processus neuf lancé avec ``python -X importtime`` :
+le script est exécuté une première fois en mode démo via AppTest (sans réseau),
+puis chaque section du menu est ouverte une fois pour mesurer ce que le
+chargement paresseux y a déplacé.
+
+Usage : python benchmarks/bench_startup.py [--runs N] [--budget-ms MS] [--top K]
+Code de sortie 1 si la médiane du premier affichage dépasse le budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD = os.path.join(ROOT, 'Dashboard.py')
+
+# Budget de premier affichage (exécution à froid du script, hors démarrage du serveur Streamlit)
+STARTUP_BUDGET_MS = 1000
+
+MARKER = '--- first paint ---'
+
+PROBE = r'''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file({dashboard!r}, default_timeout=300)
+at.session_state['demo_mode'] = True
+sys.stderr.write({marker!r} + '\n')
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+result = {{'first_paint_ms': (time.perf_counter() - start) * 1000, 'sections_ms': {{}},
+          'errors': [str(e.value) for e in at.exception]}}
+for label in at.sidebar.radio[0].options[1:]:
+    at.sidebar.radio[0].set_value(label)
+    start = time.perf_counter()
+    at.run()
+    result['sections_ms'][label] = (time.perf_counter() - start) * 1000
+    result['errors'] += [str(e.value) for e in at.exception]
+print(json.dumps(result))
+'''
+
+
+def parse_importtime(stderr):
+    """Modules importés après le marqueur : {nom: cumul en ms} pour les imports de premier niveau"""
+    totals = {}
+    started = False
+    for line in stderr.splitlines():
+        if line.strip() == MARKER:
+            started = True
+            continue
+        if not started or not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2]
+        # Un module de premier niveau n'a qu'une espace d'indentation dans la sortie -X importtime
+        if name.startswith('  '):
+            continue
+        totals[name.strip()] = totals.get(name.strip(), 0) + int(fields[1]) / 1000
+    return totals
+
+
+def run_once():
+    probe = PROBE.format(dashboard=DASHBOARD, marker=MARKER)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe], cwd=ROOT,
+                          capture_output=True, text=True)
+    lines = [l for l in proc.stdout.splitlines() if l.startswith('{')]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(lines[-1])
+    result['imports_ms'] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    errors = sorted({e for r in runs for e in r['errors']})
+    first_paint = statistics.median(r['first_paint_ms'] for r in runs)
+
+    print(f"Premier affichage (médiane de {args.runs}) : {first_paint:,.0f} ms  (budget {args.budget_ms:,.0f} ms)")
+    print("\nPremière ouverture de chaque section :")
+    for label in runs[0]['sections_ms']:
+        print(f"  {label:<32} {statistics.median(r['sections_ms'][label] for r in runs):>8,.0f} ms")
+
+    imports = runs[-1]['imports_ms']
+    print(f"\nImports déclenchés par le script (cumul, top {args.top}) :")
+    for name, ms in sorted(imports.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<40} {ms:>8,.1f} ms")
+    if errors:
+        print("\nErreurs :", *errors, sep='\n  ')
+    return 1 if first_paint > args.budget_ms or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Remplaçant local et déterministe de yfinance pour les benchmarks (aucun accès réseau)
+
+Les données viennent du simulateur ``tracker.demo`` : mêmes symboles, mêmes
+prix d'une exécution à l'autre. Chaque « requête HTTP » simulée attend
+``latency`` secondes et est comptée, ``download`` comptant une requête par
+symbole comme le vrai client.
+
+``install()`` enregistre le module dans ``sys.modules['yfinance']`` : les
+fonctions ``yf_*`` de tracker/ importent yfinance à l'appel et utilisent donc
+le remplaçant sans autre modification.
+"""
+import sys
+import threading
+import time
+import types
+
+import pandas as pd
+
+from tracker.demo import INTERVAL_MINUTES, demo_history
+
+
+class UpstreamStub:
+    """État partagé du faux yfinance : latence et compteur de requêtes par endpoint"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    def _hit(self, endpoint, n=1):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + n
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+
+    def history(self, symbol, period=None, interval='1d', start=None):
+        self._hit('history')
+        if start is None:
+            return demo_history(symbol, period or '1mo', interval)
+        # Mise à jour incrémentale : la plus longue période servie pour l'intervalle, coupée à ``start``
+        df = demo_history(symbol, '1mo' if interval in INTERVAL_MINUTES else 'max', interval)
+        return df[df.index >= pd.Timestamp(start)]
+
+    def info(self, symbol):
+        self._hit('info')
+        return {
+            'longName': f'{symbol} (stub)',
+            'shortName': symbol,
+            'sector': 'Technology',
+            'industry': 'Electronics',
+            'currency': 'KRW' if symbol.endswith(('.KS', '.KQ')) else 'USD',
+            'marketCap': 100_000_000_000_000,
+            'trailingPE': 15.0,
+            'beta': 1.0,
+        }
+
+    def download(self, tickers, period='1mo', interval='1d', **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self._hit('download', len(tickers))
+        frames = {s: demo_history(s, period, interval).tz_convert('UTC') for s in tickers}
+        return pd.concat(frames, axis=1)
+
+
+def build_module(stub):
+    module = types.ModuleType('yfinance')
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.ticker = symbol
+
+        def history(self, period=None, interval='1d', start=None, timeout=None, **kwargs):
+            return stub.history(self.ticker, period, interval, start)
+
+        @property
+        def info(self):
+            return stub.info(self.ticker)
+
+    module.Ticker = Ticker
+    module.download = stub.download
+    module.__stub__ = stub
+    return module
+
+
+def install(latency=0.05):
+    """Remplace yfinance dans le processus courant ; renvoie le ``UpstreamStub``"""
+    stub = UpstreamStub(latency)
+    sys.modules['yfinance'] = build_module(stub)
+    return stub
@@ -0,0 +1 @@
+"""Briques de données et de calcul du Tracker Bourse Corée (hors interface Streamlit)"""
@@ -0,0 +1,163 @@
+"""Service d'alertes autonome, indépendant des sessions navigateur
+
+Usage : python -m tracker.alert_daemon --store .cache/alerts.json [--once]
+
+La configuration SMTP est lue dans l'environnement : SMTP_SERVER, SMTP_PORT,
+SMTP_EMAIL, SMTP_PASSWORD, SMTP_STARTTLS (auto, always ou never ; auto par défaut)
+et ALERT_TO (destinataire, SMTP_EMAIL par défaut).
+Sans SMTP_EMAIL, les alertes sont seulement journalisées.
+"""
+import argparse
+import logging
+import os
+import time
+from datetime import datetime
+
+from tracker.alerts import AlertStore
+from tracker.governor import GOVERNOR
+from tracker.market_calendar import KOREA_TIMEZONE, RefreshPolicy, get_market_status
+from tracker.notifications import NotificationQueue
+from tracker.quotes import WatchlistQuoteEngine
+
+logger = logging.getLogger('alert_daemon')
+
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'alerts.json')
+
+
+def email_config_from_env():
+    """Configuration email au format ``email_config`` du tableau de bord"""
+    email = os.environ.get('SMTP_EMAIL', '')
+    return {
+        'enabled': bool(email),
+        'smtp_server': os.environ.get('SMTP_SERVER', 'smtp.gmail.com'),
+        'smtp_port': int(os.environ.get('SMTP_PORT', 587)),
+        'email': email,
+        'password': os.environ.get('SMTP_PASSWORD', ''),
+        'starttls': os.environ.get('SMTP_STARTTLS', 'auto'),
+        'to': os.environ.get('ALERT_TO', email),
+    }
+
+
+def format_alert_body(alert, price):
+    """Corps HTML d'une alerte déclenchée"""
+    return f"""
+    <h2>Alerte de prix déclenchée</h2>
+    <p><b>Symbole:</b> {alert['symbol']}</p>
+    <p><b>Prix actuel:</b> {price:,.2f}</p>
+    <p><b>Condition:</b> {alert['condition']} {alert['price']:,.2f}</p>
+    <p><b>Date:</b> {datetime.now(KOREA_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')} (KST)</p>
+    """
+
+
+class AlertDaemon:
+    """Boucle d'évaluation : charge les alertes, interroge les prix par lots, notifie"""
+
+    def __init__(self, store, engine=None, policy=None, email_config=None, notify=None,
+                 fast_interval=30, chunk_size=100, governor=GOVERNOR):
+        self.store = store
+        self.engine = engine or WatchlistQuoteEngine(ttl=0)
+        self.policy = policy or RefreshPolicy()
+        self.email_config = email_config or email_config_from_env()
+        self.notify = notify or self._send_email
+        self._queue = NotificationQueue(self.email_config) if self.email_config['enabled'] else None
+        self.fast_interval = fast_interval
+        self.chunk_size = chunk_size
+        self._book = None
+        self._book_mtime = None
+        # Les 2 s de la file background visent le tableau de bord, où un utilisateur attend ;
+        # ici personne n'attend : un lot peut patienter le temps de recharger tout un paquet
+        governor.set_max_wait('background', max(self.chunk_size / governor.rate, 2.0))
+
+    def _send_email(self, alert, price):
+        if self._queue is None:
+            return
+        # Les alertes d'un même cycle partent en un seul récapitulatif
+        subject = f"🚨 Alerte prix - {alert['symbol']}"
+        self._queue.submit(subject, format_alert_body(alert, price), self.email_config['to'],
+                           dedup_key=alert['id'])
+
+    def _load(self):
+        mtime = self.store.mtime()
+        if self._book is None or mtime != self._book_mtime:
+            self._book = self.store.load_book()
+            self._book_mtime = mtime
+        return self._book
+
+    def fetch_prices(self, symbols):
+        """Prix des symboles, par lots de ``chunk_size`` téléchargements groupés"""
+        prices = {}
+        for i in range(0, len(symbols), self.chunk_size):
+            chunk = symbols[i:i + self.chunk_size]
+            try:
+                quotes = self.engine.get_quotes(chunk)
+            except Exception as e:
+                logger.warning("Échec de récupération pour %d symboles : %s", len(chunk), e)
+                continue
+            found = quotes['price'].dropna()
+            if len(found) < len(chunk):
+                missing = [s for s in chunk if s not in found.index]
+                logger.warning("Prix indisponibles pour %d/%d symboles : %s", len(missing), len(chunk),
+                               ', '.join(missing[:10]) + (' ...' if len(missing) > 10 else ''))
+            prices.update(found.to_dict())
+        return prices
+
+    def run_cycle(self):
+        """Un cycle complet ; renvoie le nombre d'alertes déclenchées"""
+        start = time.perf_counter()
+        book = self._load()
+        symbols = book.symbols()
+        if not symbols:
+            return 0
+        alert_count = len(book)
+
+        triggered = book.evaluate(self.fetch_prices(symbols))
+        for alert, price in triggered:
+            logger.info("Alerte %s %s %s (prix %s)", alert['symbol'], alert['condition'], alert['price'], price)
+            try:
+                self.notify(alert, price)
+            except Exception as e:
+                logger.error("Erreur d'envoi: %s", e)
+
+        # ``_book_mtime`` reste celui lu au chargement : toute écriture depuis (tableau de
+        # bord ou retrait ci-dessous) fait recharger le carnet au prochain cycle
+        self.store.remove(alert['id'] for alert, _ in triggered if alert['one_time'])
+        logger.info("Cycle : %d alertes, %d symboles, %d déclenchées, %.0f ms",
+                    alert_count, len(symbols), len(triggered), (time.perf_counter() - start) * 1e3)
+        return len(triggered)
+
+    def next_delay(self):
+        """Attente avant le prochain cycle : rapide pendant la séance, au repos sinon"""
+        symbols = self._book.symbols() if self._book is not None else []
+        return self.policy.poll_interval(symbols, self.fast_interval)
+
+    def flush(self, timeout=60):
+        """Attend l'envoi des notifications en file"""
+        if self._queue is not None:
+            self._queue.flush(timeout)
+
+    def run_forever(self):
+        while True:
+            status, icon = get_market_status()
+            logger.info("%s Marché Coréen: %s", icon, status)
+            self.run_cycle()
+            time.sleep(self.next_delay())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service d'alertes de prix (KOSPI/KOSDAQ/ADR)")
+    parser.add_argument('--store', default=DEFAULT_STORE, help="fichier JSON des alertes")
+    parser.add_argument('--interval', type=int, default=30, help="cadence en séance (secondes)")
+    parser.add_argument('--once', action='store_true', help="un seul cycle puis sortie")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    daemon = AlertDaemon(AlertStore(args.store), fast_interval=args.interval)
+    if args.once:
+        daemon.run_cycle()
+        daemon.flush()
+    else:
+        daemon.run_forever()
+
+
+if __name__ == '__main__':
+    main()
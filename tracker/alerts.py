@@ -0,0 +1,170 @@
+"""Moteur d'alertes de prix indexé par symbole (seuils triés, recherche par bisection)"""
+import itertools
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows : seul le verrou du processus s'applique
+    fcntl = None
+
+
+class AlertBook:
+    """Alertes de prix indexées par symbole et par sens
+
+    Pour chaque symbole, les seuils « au-dessus » et « en dessous » sont gardés
+    triés : un prix ne déclenche que les seuils franchis, trouvés par bisection
+    en O(log n + k). Les alertes sont des dictionnaires
+    ``{'id', 'symbol', 'condition': 'above'|'below', 'price', 'one_time'}``.
+    """
+
+    def __init__(self, alerts=()):
+        self._alerts = {}
+        self._index = {'above': {}, 'below': {}}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        for alert in alerts:
+            self.add(alert)
+
+    def add(self, alert):
+        """Ajoute une alerte et renvoie son identifiant"""
+        if alert['condition'] not in self._index:
+            raise ValueError(f"Condition inconnue : {alert['condition']}")
+        with self._lock:
+            alert = dict(alert)
+            alert_id = alert.get('id')
+            if alert_id is None or alert_id in self._alerts:
+                alert_id = next(self._ids)
+                while alert_id in self._alerts:
+                    alert_id = next(self._ids)
+            alert['id'] = alert_id
+            alert['price'] = float(alert['price'])
+            alert.setdefault('one_time', False)
+            self._alerts[alert_id] = alert
+            insort(self._index[alert['condition']].setdefault(alert['symbol'], []),
+                   (alert['price'], alert_id))
+            return alert_id
+
+    def remove(self, alert_id):
+        """Supprime une alerte (sans effet si elle n'existe plus)"""
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return
+            entries = self._index[alert['condition']][alert['symbol']]
+            entries.pop(bisect_left(entries, (alert['price'], alert_id)))
+            if not entries:
+                del self._index[alert['condition']][alert['symbol']]
+
+    def crossed(self, symbol, price):
+        """Alertes déclenchées par ``price`` pour un symbole"""
+        with self._lock:
+            above = self._index['above'].get(symbol, [])
+            below = self._index['below'].get(symbol, [])
+            # Seuils au-dessus : seuil <= prix ; seuils en dessous : seuil >= prix
+            hits = above[:bisect_right(above, (price, float('inf')))]
+            hits += below[bisect_left(below, (price, -1)):]
+            return [self._alerts[alert_id] for _, alert_id in hits]
+
+    def evaluate(self, prices):
+        """Évalue un lot de prix ``{symbole: prix}`` ; renvoie [(alerte, prix)]
+
+        Les alertes ponctuelles déclenchées sont retirées après l'évaluation du lot.
+        """
+        triggered = []
+        with self._lock:
+            for symbol, price in prices.items():
+                if price is None or price != price:
+                    continue
+                triggered.extend((alert, price) for alert in self.crossed(symbol, price))
+            for alert, _ in triggered:
+                if alert['one_time']:
+                    self.remove(alert['id'])
+        return triggered
+
+    def symbols(self):
+        """Symboles ayant au moins une alerte"""
+        with self._lock:
+            return sorted(set(self._index['above']) | set(self._index['below']))
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._alerts.values()))
+
+    def __len__(self):
+        return len(self._alerts)
+
+
+class AlertStore:
+    """Stockage JSON persistant des alertes, partagé entre le tableau de bord et le service d'alertes
+
+    Les deux processus écrivent le même fichier : chaque lecture-modification-écriture
+    se fait sous un verrou ``flock`` sur ``<path>.lock``, et le fichier est remplacé
+    atomiquement depuis un fichier temporaire propre à l'écrivain.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _write(self, alerts):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(alerts, f, indent=1)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @contextmanager
+    def _exclusive(self):
+        """Verrou exclusif entre threads et entre processus pour une modification du fichier"""
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path + '.lock', 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def mtime(self):
+        """Horodatage (ns) de la dernière écriture, None si le fichier n'existe pas"""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def load_book(self):
+        """Charge toutes les alertes dans un AlertBook"""
+        with self._lock:
+            return AlertBook(self._read())
+
+    def add(self, alert):
+        """Ajoute une alerte au stockage et renvoie son identifiant"""
+        with self._exclusive():
+            alerts = self._read()
+            alert = dict(alert)
+            alert['id'] = max((a['id'] for a in alerts), default=0) + 1
+            alerts.append(alert)
+            self._write(alerts)
+            return alert['id']
+
+    def remove(self, alert_ids):
+        """Retire des alertes du stockage (par exemple les alertes ponctuelles déclenchées)"""
+        alert_ids = set(alert_ids)
+        if not alert_ids:
+            return
+        with self._exclusive():
+            self._write([a for a in self._read() if a['id'] not in alert_ids])
@@ -0,0 +1,76 @@
+"""Conteneur OHLCV compact : tableaux NumPy contigus au lieu d'un DataFrame par historique
+
+Horodatages epoch UTC en int64 (ns), Open/High/Low en float32 (un bloc n x 3 en
+ordre Fortran, donc chaque colonne est contiguë), Close en float64 et volume en
+int64 : 36 octets par barre, contre 48 pour le DataFrame float64 équivalent. La
+clôture garde sa pleine précision : elle est comparée aux seuils d'alerte et sert
+aux rendements. La conversion vers pandas (``to_frame``) partage la mémoire des
+tableaux de prix et de volume.
+"""
+import numpy as np
+import pandas as pd
+
+from tracker.timezones import utc_nanos
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+# Colonnes stockées en float32 ; Close reste en float64
+RANGE_COLUMNS = PRICE_COLUMNS[:3]
+
+
+def utc_index(nanos):
+    """DatetimeIndex UTC à partir d'horodatages epoch en int64 (ns)"""
+    return pd.DatetimeIndex(nanos.view('M8[ns]'), tz='UTC')
+
+
+class OHLCVBars:
+    """Historique OHLCV en tableaux contigus (voir le docstring du module)"""
+
+    __slots__ = ('ts', 'ranges', 'close', 'volume')
+
+    def __init__(self, ts, ranges, close, volume):
+        self.ts = np.ascontiguousarray(ts, dtype=np.int64)
+        self.ranges = np.asfortranarray(ranges, dtype=np.float32).reshape(len(self.ts), len(RANGE_COLUMNS))
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Convertit un DataFrame OHLCV (index daté, naïf = UTC) ; les autres colonnes sont ignorées"""
+        if df is None or df.empty:
+            return cls.empty()
+        ranges = np.empty((len(df), len(RANGE_COLUMNS)), dtype=np.float32, order='F')
+        for i, column in enumerate(RANGE_COLUMNS):
+            ranges[:, i] = df[column].to_numpy(dtype=np.float32)
+        volume = df['Volume'].fillna(0).to_numpy(dtype=np.int64) if 'Volume' in df else np.zeros(len(df), np.int64)
+        return cls(utc_nanos(df.index), ranges, df['Close'].to_numpy(dtype=np.float64), volume)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int64), np.empty((0, len(RANGE_COLUMNS)), np.float32),
+                   np.empty(0, np.float64), np.empty(0, np.int64))
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + self.ranges.nbytes + self.close.nbytes + self.volume.nbytes
+
+    def __getstate__(self):
+        return self.ts, self.ranges, self.close, self.volume
+
+    def __setstate__(self, state):
+        self.ts, self.ranges, self.close, self.volume = state
+
+    def between(self, start=None, end=None):
+        """Vue (sans copie) des barres dont l'horodatage (ns UTC) est dans [start, end]"""
+        lo = 0 if start is None else np.searchsorted(self.ts, start, side='left')
+        hi = len(self.ts) if end is None else np.searchsorted(self.ts, end, side='right')
+        return OHLCVBars(self.ts[lo:hi], self.ranges[lo:hi], self.close[lo:hi], self.volume[lo:hi])
+
+    def to_frame(self):
+        """DataFrame pandas (index UTC) qui partage la mémoire des tableaux de prix et de volume"""
+        columns = {name: self.ranges[:, i] for i, name in enumerate(RANGE_COLUMNS)}
+        columns['Close'] = self.close
+        columns['Volume'] = self.volume
+        return pd.DataFrame(columns, index=utc_index(self.ts), copy=False)
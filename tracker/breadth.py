@@ -0,0 +1,122 @@
+"""Statistiques de marché (largeur, plus fortes variations, secteurs) sur un instantané de cotations"""
+import numpy as np
+import pandas as pd
+
+KOREAN_INDICES = {
+    '^KS11': 'KOSPI Composite',
+    '^KQ11': 'KOSDAQ Composite',
+}
+
+# Principales valeurs des indices : symbole -> (nom, secteur)
+CONSTITUENTS = {
+    # KOSPI
+    '005930.KS': ('Samsung Electronics', 'Technologie'),
+    '000660.KS': ('SK Hynix', 'Technologie'),
+    '373220.KS': ('LG Energy Solution', 'Batteries'),
+    '207940.KS': ('Samsung Biologics', 'Santé'),
+    '005380.KS': ('Hyundai Motor', 'Automobile'),
+    '000270.KS': ('Kia', 'Automobile'),
+    '012330.KS': ('Hyundai Mobis', 'Automobile'),
+    '068270.KS': ('Celltrion', 'Santé'),
+    '035420.KS': ('NAVER', 'Communication'),
+    '035720.KS': ('Kakao', 'Communication'),
+    '259960.KS': ('Krafton', 'Communication'),
+    '036570.KS': ('NCsoft', 'Communication'),
+    '017670.KS': ('SK Telecom', 'Communication'),
+    '051910.KS': ('LG Chem', 'Matériaux'),
+    '005490.KS': ('POSCO Holdings', 'Matériaux'),
+    '010130.KS': ('Korea Zinc', 'Matériaux'),
+    '003670.KS': ('POSCO Future M', 'Batteries'),
+    '006400.KS': ('Samsung SDI', 'Batteries'),
+    '066570.KS': ('LG Electronics', 'Technologie'),
+    '009150.KS': ('Samsung Electro-Mechanics', 'Technologie'),
+    '018260.KS': ('Samsung SDS', 'Technologie'),
+    '105560.KS': ('KB Financial', 'Finance'),
+    '055550.KS': ('Shinhan Financial', 'Finance'),
+    '086790.KS': ('Hana Financial', 'Finance'),
+    '316140.KS': ('Woori Financial', 'Finance'),
+    '032830.KS': ('Samsung Life', 'Finance'),
+    '323410.KS': ('KakaoBank', 'Finance'),
+    '003550.KS': ('LG Corp', 'Industrie'),
+    '034730.KS': ('SK Inc', 'Industrie'),
+    '329180.KS': ('HD Hyundai Heavy Industries', 'Industrie'),
+    '012450.KS': ('Hanwha Aerospace', 'Industrie'),
+    '011200.KS': ('HMM', 'Industrie'),
+    '096770.KS': ('SK Innovation', 'Énergie'),
+    '015760.KS': ('KEPCO', 'Services publics'),
+    '033780.KS': ('KT&G', 'Consommation'),
+    '090430.KS': ('Amorepacific', 'Consommation'),
+    '097950.KS': ('CJ CheilJedang', 'Consommation'),
+    # KOSDAQ
+    '247540.KQ': ('Ecopro BM', 'Batteries'),
+    '086520.KQ': ('Ecopro', 'Batteries'),
+    '196170.KQ': ('Alteogen', 'Santé'),
+    '028300.KQ': ('HLB', 'Santé'),
+    '145020.KQ': ('Hugel', 'Santé'),
+    '263750.KQ': ('Pearl Abyss', 'Communication'),
+    '293490.KQ': ('Kakao Games', 'Communication'),
+    '035900.KQ': ('JYP Entertainment', 'Communication'),
+    '041510.KQ': ('SM Entertainment', 'Communication'),
+    '058470.KQ': ('Leeno Industrial', 'Technologie'),
+    '357780.KQ': ('Soulbrain', 'Matériaux'),
+}
+
+
+def market_of(symbol):
+    if symbol.endswith('.KS'):
+        return 'KOSPI'
+    if symbol.endswith('.KQ'):
+        return 'KOSDAQ'
+    return 'ADR US'
+
+
+def breadth_universe(watchlist):
+    """Indices + principales valeurs + watchlist, sans doublon"""
+    return list(dict.fromkeys(list(KOREAN_INDICES) + list(CONSTITUENTS) + list(watchlist)))
+
+
+def snapshot_frame(quotes):
+    """Enrichit les cotations (price, prev_close, change_pct) avec nom, secteur et marché"""
+    snap = quotes.copy()
+    symbols = snap.index.to_numpy()
+    meta = pd.DataFrame.from_dict(CONSTITUENTS, orient='index', columns=['name', 'sector'])
+    snap = snap.join(meta, how='left')
+    snap['name'] = snap['name'].fillna(pd.Series(symbols, index=snap.index))
+    snap['sector'] = snap['sector'].fillna('Autre')
+    snap['market'] = [market_of(s) for s in symbols]
+    return snap
+
+
+def compute_breadth(snapshot, top_n=5):
+    """Statistiques de largeur de marché en opérations groupées sur l'instantané
+
+    Renvoie un dict : ``summary`` (hausses/baisses par marché), ``gainers``,
+    ``losers`` et ``sectors`` (variation moyenne et part de hausses par secteur).
+    """
+    stocks = snapshot[~snapshot.index.isin(list(KOREAN_INDICES))].dropna(subset=['change_pct'])
+    direction = np.sign(stocks['change_pct'].to_numpy())
+    flags = pd.DataFrame({
+        'market': stocks['market'].to_numpy(),
+        'advancers': direction > 0,
+        'decliners': direction < 0,
+        'unchanged': direction == 0,
+    })
+    summary = flags.groupby('market')[['advancers', 'decliners', 'unchanged']].sum()
+    summary.loc['Total'] = summary.sum()
+    summary['ratio A/D'] = summary['advancers'] / summary['decliners'].replace(0, np.nan)
+
+    sectors = stocks.assign(up=direction > 0).groupby('sector').agg(
+        change_pct=('change_pct', 'mean'),
+        count=('change_pct', 'size'),
+        advancers_pct=('up', 'mean'),
+    )
+    sectors['advancers_pct'] *= 100
+
+    columns = ['name', 'market', 'sector', 'price', 'change_pct']
+    return {
+        'summary': summary,
+        'gainers': stocks.nlargest(top_n, 'change_pct')[columns],
+        'losers': stocks.nsmallest(top_n, 'change_pct')[columns],
+        'sectors': sectors.sort_values('change_pct', ascending=False),
+        'stocks': stocks,
+    }
@@ -0,0 +1,206 @@
+"""Simulateur de marché déterministe pour le mode démo et les bancs d'essai hors ligne
+
+Chaque symbole possède un flux aléatoire stable (graine ``zlib.crc32``, générateur
+Philox adressable par position) : une séance donnée produit toujours les mêmes
+barres, quelle que soit la période demandée ou le processus qui les calcule.
+La trajectoire journalière sert d'ancre : les barres intraday d'une séance sont
+un pont brownien entre la clôture précédente et la clôture du jour, de sorte que
+graphique, tuiles de la watchlist et largeur de marché affichent les mêmes prix.
+Pendant la séance, la barre journalière du jour s'arrête au point du pont 1m à
+l'instant courant : la clôture de fin de journée n'est jamais dévoilée d'avance.
+"""
+import zlib
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from tracker.market_calendar import EXCHANGES, exchange_for_symbol
+from tracker.ohlcv_store import PERIOD_OFFSETS, PERIOD_SESSIONS
+
+# Première séance simulée (période "max")
+DEMO_EPOCH = date(2010, 1, 4)
+
+# Retour à la moyenne du log-prix autour du prix de référence (demi-vie ~140 séances)
+MEAN_REVERSION = 0.995
+
+# Prix de référence, volatilité journalière, volume moyen
+SYMBOL_PROFILES = {
+    '005930.KS': (73500, 0.02, 12_000_000),
+    '000660.KS': (120000, 0.025, 3_000_000),
+    '207940.KS': (800000, 0.015, 100_000),
+    '^KS11': (2600, 0.01, 400_000_000),
+    '^KQ11': (850, 0.013, 900_000_000),
+}
+DEFAULT_PROFILES = {
+    'KRX': (50000, 0.03, 5_000_000),
+    'NYSE': (100, 0.02, 5_000_000),
+}
+
+INTERVAL_MINUTES = {'1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60}
+RESAMPLE_RULES = {'5d': '5B', '1wk': 'W-MON', '1mo': 'MS', '3mo': 'QS'}
+
+# Tirages uniformes consommés par barre (rendement, mèche haute, mèche basse, volume)
+_DRAWS_PER_BAR = 4
+
+_HOLIDAYS = {ex: np.array(sorted(cfg['holidays']), dtype='datetime64[D]') for ex, cfg in EXCHANGES.items()}
+
+
+def symbol_seed(symbol):
+    """Graine stable d'un processus à l'autre (contrairement à ``hash``)"""
+    return zlib.crc32(symbol.encode('utf-8'))
+
+
+def profile_for(symbol):
+    return SYMBOL_PROFILES.get(symbol) or DEFAULT_PROFILES[exchange_for_symbol(symbol)]
+
+
+def trading_days(exchange, start, end):
+    """Séances entre deux dates incluses (``datetime64[D]``)"""
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    return days[np.is_busday(days, holidays=_HOLIDAYS[exchange])]
+
+
+def _normals(symbol, stream, first_row, rows):
+    """Lignes ``[first_row, first_row + rows)`` d'un flux de normales (rows x 4) adressable par position"""
+    bitgen = np.random.Philox(key=(symbol_seed(symbol) << 32) | stream)
+    bitgen.advance(int(first_row))  # une avance = 4 tirages = une ligne
+    u = np.random.Generator(bitgen).random((rows, _DRAWS_PER_BAR))
+    radius = np.sqrt(-2.0 * np.log1p(-u[:, 0::2]))
+    angle = 2.0 * np.pi * u[:, 1::2]
+    return np.concatenate([radius * np.cos(angle), radius * np.sin(angle)], axis=1)
+
+
+@lru_cache(maxsize=512)
+def _daily_path(symbol, last_day):
+    """Séances et log-clôtures depuis ``DEMO_EPOCH`` ; le préfixe ne dépend pas de ``last_day``"""
+    base, vol, _ = profile_for(symbol)
+    days = trading_days(exchange_for_symbol(symbol), DEMO_EPOCH, last_day)
+    z = _normals(symbol, 0, 0, len(days))
+    # Processus d'Ornstein-Uhlenbeck calculé comme une moyenne exponentielle (passe vectorisée)
+    alpha = 1.0 - MEAN_REVERSION
+    shocks = z[:, 0] * vol / alpha
+    shocks[0] = 0.0
+    deviation = pd.Series(shocks).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return days, np.log(base) + deviation, z
+
+
+def _session_count(period, days):
+    if period == 'max':
+        return len(days)
+    if period in PERIOD_SESSIONS:
+        return min(PERIOD_SESSIONS[period], len(days))
+    start = pd.Timestamp(days[-1]) - PERIOD_OFFSETS[period]
+    return len(days) - np.searchsorted(days, np.datetime64(start.date(), 'D'))
+
+
+def _local_now(exchange, now):
+    tz = EXCHANGES[exchange]['tz']
+    if now is None:
+        return datetime.now(tz)
+    if now.tzinfo is None:
+        return tz.localize(now)
+    return now.astimezone(tz)
+
+
+def _ohlcv(open_, close, wick_hi, wick_lo, vol_noise, sigma, avg_volume):
+    high = np.maximum(open_, close) * np.exp(np.abs(wick_hi) * sigma * 0.5)
+    low = np.minimum(open_, close) * np.exp(-np.abs(wick_lo) * sigma * 0.5)
+    volume = np.round(avg_volume * np.exp(0.4 * vol_noise - 0.08)).astype(np.int64)
+    return {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+
+
+def _last_session_day(cfg, now):
+    """Dernier jour pouvant porter une séance : la veille tant que la bourse n'a pas ouvert"""
+    return now.date() if now.time() >= cfg['open'] else now.date() - timedelta(days=1)
+
+
+def _daily_frame(symbol, period, now):
+    exchange = exchange_for_symbol(symbol)
+    cfg = EXCHANGES[exchange]
+    days, log_close, z = _daily_path(symbol, _last_session_day(cfg, now))
+    n = _session_count(period, days)
+    _, vol, avg_volume = profile_for(symbol)
+    close = np.exp(log_close)
+    prev_close = np.concatenate([close[:1], close[:-1]])
+    open_ = prev_close * np.exp(z[:, 1] * vol * 0.3)
+    data = _ohlcv(open_, close, z[:, 2], z[:, 3], z[:, 1], vol, avg_volume)
+    index = pd.DatetimeIndex(days[-n:]).tz_localize(cfg['tz'])
+    df = pd.DataFrame({k: v[-n:] for k, v in data.items()}, index=index)
+    if days[-1] == np.datetime64(now.date(), 'D') and now.time() < cfg['close']:
+        df = _cap_session(df, _intraday_frame(symbol, '1d', 1, now))
+    return df
+
+
+def _cap_session(df, today):
+    """Séance en cours : la barre du jour s'arrête au pont brownien 1m à ``now`` (pas de clôture future)"""
+    if today.empty:
+        return df
+    df = df.copy()
+    row = df.index[-1]
+    close = today['Close'].iloc[-1]
+    df.loc[row, 'Close'] = close
+    df.loc[row, 'High'] = max(df.at[row, 'Open'], close, today['High'].max())
+    df.loc[row, 'Low'] = min(df.at[row, 'Open'], close, today['Low'].min())
+    df.loc[row, 'Volume'] = today['Volume'].sum()
+    return df
+
+
+def _intraday_frame(symbol, period, minutes, now):
+    exchange = exchange_for_symbol(symbol)
+    cfg = EXCHANGES[exchange]
+    # Même dernière séance que l'historique journalier : avant l'ouverture, celle de la veille
+    days, log_close, _ = _daily_path(symbol, _last_session_day(cfg, now))
+    n_days = _session_count(period, days)
+    first = len(days) - n_days
+    _, vol, avg_volume = profile_for(symbol)
+
+    session_minutes = (datetime.combine(date.min, cfg['close']) - datetime.combine(date.min, cfg['open'])).seconds // 60
+    bars = -(-session_minutes // minutes)
+    sigma = vol * np.sqrt(minutes / session_minutes)
+
+    # Un bloc de tirages par séance, à une position fixe du flux : une séance est identique d'une période à l'autre
+    z = _normals(symbol, minutes, first * bars, n_days * bars).reshape(n_days, bars, _DRAWS_PER_BAR)
+    start = np.concatenate([log_close[:1], log_close[:-1]])[first:]
+    end = log_close[first:]
+    walk = np.cumsum(z[:, :, 0] * sigma, axis=1)
+    # Pont brownien : la dernière barre de chaque séance rejoint la clôture journalière
+    frac = np.arange(1, bars + 1) / bars
+    path = start[:, None] + walk - frac * (walk[:, -1:] - (end - start)[:, None])
+    close = np.exp(path)
+    open_ = np.concatenate([np.exp(start)[:, None], close[:, :-1]], axis=1)
+    # Volume en U sur la séance
+    shape = 1.0 + 1.5 * (2 * frac - 1 - 1 / bars) ** 2
+    bar_volume = avg_volume * minutes / session_minutes * shape / shape.mean()
+    data = _ohlcv(open_, close, z[:, :, 1], z[:, :, 2], z[:, :, 3], sigma, bar_volume)
+
+    open_offset = np.timedelta64(cfg['open'].hour * 60 + cfg['open'].minute, 'm')
+    stamps = (days[first:, None].astype('datetime64[m]') + open_offset
+              + np.arange(bars) * np.timedelta64(minutes, 'm')).ravel()
+    index = pd.DatetimeIndex(stamps).tz_localize(cfg['tz'])
+    df = pd.DataFrame({k: v.ravel() for k, v in data.items()}, index=index)
+    return df.loc[df.index <= now]
+
+
+def demo_history(symbol, period='1mo', interval='1d', now=None):
+    """Historique OHLCV simulé à l'intervalle et sur la période demandés (index dans le fuseau de la bourse)"""
+    now = _local_now(exchange_for_symbol(symbol), now)
+    if interval in INTERVAL_MINUTES:
+        return _intraday_frame(symbol, period, INTERVAL_MINUTES[interval], now)
+    df = _daily_frame(symbol, period, now)
+    if interval in RESAMPLE_RULES:
+        df = df.resample(RESAMPLE_RULES[interval], label='left', closed='left').agg(
+            {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
+    return df
+
+
+def demo_quotes(symbols, now=None):
+    """Dernier prix et clôture précédente, mêmes colonnes que ``WatchlistQuoteEngine.get_quotes``"""
+    rows = {}
+    for symbol in symbols:
+        closes = demo_history(symbol, '5d', '1d', now)['Close']
+        rows[symbol] = (closes.iloc[-1], closes.iloc[-2])
+    quotes = pd.DataFrame.from_dict(rows, orient='index', columns=['price', 'prev_close'])
+    quotes['change_pct'] = (quotes['price'] / quotes['prev_close'] - 1) * 100
+    return quotes
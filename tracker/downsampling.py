@@ -0,0 +1,96 @@
+"""Réduction côté serveur des séries volumineuses avant construction des graphiques plotly"""
+import numpy as np
+import pandas as pd
+
+# Densité visuelle utile : ~2 points par pixel pour une ligne, ~1 bougie pour 3 pixels
+POINTS_PER_PX_LINE = 2
+PX_PER_CANDLE = 3
+
+
+def target_points(width_px, candles):
+    """Nombre de points à envoyer au navigateur pour une largeur de graphique donnée"""
+    if candles:
+        return max(int(width_px // PX_PER_CANDLE), 10)
+    return max(int(width_px * POINTS_PER_PX_LINE), 10)
+
+
+def bucket_starts(n, n_buckets):
+    """Début de chaque tranche contiguë quand on découpe ``n`` lignes en ``n_buckets`` tranches"""
+    n_buckets = max(1, min(n_buckets, n))
+    return np.unique(np.linspace(0, n, n_buckets, endpoint=False).astype(np.int64))
+
+
+def _lttb_edges(n, threshold):
+    # Bornes des tranches intermédiaires (le premier et le dernier point sont toujours conservés)
+    return np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+
+def lttb_bucket_starts(n, threshold):
+    """Début des tranches dont LTTB tire chacun de ses points : premier point, intermédiaires, dernier"""
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    return np.concatenate(([0], _lttb_edges(n, threshold)[:-1], [n - 1]))
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets : positions des points conservés (premier et dernier inclus)"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = _lttb_edges(n, threshold)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Moyenne de la tranche suivante (ou dernier point)
+        nxt_start, nxt_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_start:nxt_end].mean() if nxt_end > nxt_start else x[-1]
+        avg_y = np.nanmean(y[nxt_start:nxt_end]) if nxt_end > nxt_start else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        area = np.nan_to_num(area, nan=-1.0)
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def aggregate_ohlcv(hist, starts):
+    """Agrège des tranches contiguës en conservant O/H/L/C (premier, max, min, dernier) et la somme du volume"""
+    ends = np.concatenate((starts[1:], [len(hist)])) - 1
+    data = {
+        'Open': hist['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(hist['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(hist['Low'].to_numpy(), starts),
+        'Close': hist['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(hist['Volume'].to_numpy(), starts),
+    }
+    return pd.DataFrame(data, index=hist.index[starts])
+
+
+def downsample_for_chart(hist, target, candles):
+    """Prépare l'historique pour plotly : renvoie (prix, volume, positions d'échantillonnage)
+
+    - bougies : agrégation OHLC par tranche, ``positions`` = début de chaque tranche
+    - ligne : LTTB sur la clôture, ``positions`` = points conservés
+    Le volume est toujours sommé par tranche (celles de LTTB en mode ligne) et
+    indexé comme les prix renvoyés, pour que les barres tombent sous leurs points.
+    Les indicateurs s'alignent via ``indicators.iloc[positions]``. Sous ``target``
+    lignes, rien n'est réduit.
+    """
+    n = len(hist)
+    if n <= target:
+        return hist, hist['Volume'], np.arange(n)
+
+    if candles:
+        starts = bucket_starts(n, target)
+        price = aggregate_ohlcv(hist, starts)
+        return price, price['Volume'], starts
+
+    positions = lttb_indices(hist.index.asi8, hist['Close'].to_numpy(), target)
+    volume = pd.Series(np.add.reduceat(hist['Volume'].to_numpy(), lttb_bucket_starts(n, target)),
+                       index=hist.index[positions], name='Volume')
+    return hist.iloc[positions], volume, positions
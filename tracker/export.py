@@ -0,0 +1,165 @@
+"""Export en flux de l'historique multi-symboles (CSV, Parquet, Excel)
+
+Usage : python -m tracker.export --symbols 005930.KS 000660.KS --period 5y \\
+            --interval 1d --format parquet --out export.parquet
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/octet-stream',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+COLUMNS = ['symbol', 'timestamp', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# Limite de lignes d'une feuille Excel
+XLSX_MAX_ROWS = 1_048_575
+
+
+def iter_chunks(symbols, period, interval, loader, chunk_rows=50_000, errors=None):
+    """Parcourt les symboles un par un et renvoie l'historique par tranches normalisées
+
+    Un seul symbole est en mémoire à la fois. ``loader(symbol, period, interval)``
+    renvoie un DataFrame OHLCV (par exemple ``OHLCVStore.get_history``).
+    """
+    for symbol in symbols:
+        try:
+            hist = loader(symbol, period, interval)
+        except Exception as e:
+            if errors is not None:
+                errors[symbol] = e
+            continue
+        if hist is None or hist.empty:
+            continue
+        index = hist.index
+        if index.tz is not None:
+            index = index.tz_convert('UTC')
+        for start in range(0, len(hist), chunk_rows):
+            part = hist.iloc[start:start + chunk_rows]
+            yield symbol, pd.DataFrame({
+                'symbol': symbol,
+                'timestamp': index[start:start + chunk_rows],
+                'Open': part['Open'].to_numpy(),
+                'High': part['High'].to_numpy(),
+                'Low': part['Low'].to_numpy(),
+                'Close': part['Close'].to_numpy(),
+                'Volume': part['Volume'].to_numpy(),
+            })
+        del hist
+
+
+def _write_csv(chunks, out):
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+    # Même fin de ligne pour l'en-tête (csv.writer : \r\n par défaut) et les données (to_csv : os.linesep)
+    writer = csv.writer(text, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    rows = 0
+    for _, chunk in chunks:
+        chunk.to_csv(text, header=False, index=False, date_format='%Y-%m-%dT%H:%M:%S%z', lineterminator='\n')
+        rows += len(chunk)
+    text.flush()
+    text.detach()
+    return rows
+
+
+def _write_parquet(chunks, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for _, chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema, compression='zstd')
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _write_xlsx(chunks, out):
+    from openpyxl import Workbook
+
+    # Mode write_only : les lignes sont écrites au fil de l'eau, une feuille par symbole
+    workbook = Workbook(write_only=True)
+    sheets = {}
+    rows = 0
+    for symbol, chunk in chunks:
+        sheet = sheets.get(symbol)
+        if sheet is None:
+            sheet = workbook.create_sheet(title=symbol[:31])
+            sheet.append(COLUMNS[1:])
+            sheets[symbol] = [sheet, 0]
+        sheet, written = sheets[symbol]
+        room = XLSX_MAX_ROWS - written
+        chunk = chunk.iloc[:room]
+        timestamps = chunk['timestamp'].dt.tz_localize(None) if chunk['timestamp'].dt.tz else chunk['timestamp']
+        for values in zip(timestamps.dt.to_pydatetime(), *(chunk[c].tolist() for c in COLUMNS[2:])):
+            sheet.append(values)
+        sheets[symbol][1] += len(chunk)
+        rows += len(chunk)
+    if not sheets:
+        workbook.create_sheet(title='vide')
+    workbook.save(out)
+    return rows
+
+
+WRITERS = {'csv': _write_csv, 'parquet': _write_parquet, 'xlsx': _write_xlsx}
+
+
+def export_history(symbols, period, interval, fmt, out, loader, chunk_rows=50_000):
+    """Exporte l'historique vers ``out`` (fichier binaire ouvert) ; renvoie les statistiques de débit"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Format inconnu : {fmt}")
+    errors = {}
+    start = time.perf_counter()
+    rows = WRITERS[fmt](iter_chunks(symbols, period, interval, loader, chunk_rows, errors), out)
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'symbols': len(symbols) - len(errors),
+        'errors': errors,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def main(argv=None):
+    from tracker.ohlcv_store import OHLCVStore
+
+    parser = argparse.ArgumentParser(description="Export de l'historique (CSV / Parquet / Excel)")
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--period', default='1y')
+    parser.add_argument('--interval', default='1d')
+    parser.add_argument('--format', choices=list(WRITERS), default='csv')
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--store', default=os.path.join('.cache', 'ohlcv'), help="répertoire du stock OHLCV local")
+    parser.add_argument('--chunk-rows', type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    store = OHLCVStore(args.store)
+    with open(args.out, 'wb') as out:
+        stats = export_history(args.symbols, args.period, args.interval, args.format, out,
+                               store.get_history, args.chunk_rows)
+    for symbol, error in stats['errors'].items():
+        print(f"⚠️ {symbol}: {error}", file=sys.stderr)
+    print(f"{stats['rows']:,} lignes, {stats['symbols']} symboles en {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} lignes/s) -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
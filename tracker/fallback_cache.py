@@ -0,0 +1,90 @@
+"""Cache LRU borné, partagé par le processus, des dernières données valides"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+def frame_nbytes(df):
+    """Taille mémoire approximative d'un DataFrame (ou d'un ``OHLCVBars``), en octets"""
+    if df is None:
+        return 0
+    if hasattr(df, 'nbytes'):
+        return int(df.nbytes)
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except AttributeError:
+        return 0
+
+
+class FallbackCache:
+    """Dernier historique valide par (symbole, intervalle), utilisé quand yfinance ne répond plus
+
+    Partagé entre toutes les sessions, protégé par un verrou et borné par un
+    budget mémoire (``max_mb``) : les entrées les moins récemment utilisées sont
+    évincées en premier. Les entrées plus vieilles que ``max_age`` secondes ne
+    sont plus servies. L'intervalle fait partie de la clé : une session en 1m ne
+    reçoit jamais les barres journalières d'une autre ; la période, elle, est
+    découpée à la lecture par l'appelant.
+    """
+
+    def __init__(self, max_mb=256, max_age=3600, clock=time.time):
+        self._budget = int(max_mb * 1024 * 1024)
+        self._max_age = max_age
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def put(self, symbol, interval, hist, info):
+        """Mémorise la dernière récupération réussie d'un symbole à cet intervalle"""
+        key = (symbol, interval)
+        size = frame_nbytes(hist)
+        if size > self._budget:
+            return
+        entry = {'hist': hist, 'info': info, 'timestamp': datetime.now(),
+                 'stored_at': self._clock(), 'nbytes': size}
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old['nbytes']
+            self._entries[key] = entry
+            self._nbytes += size
+            while self._nbytes > self._budget:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted['nbytes']
+                self.evictions += 1
+
+    def get(self, symbol, interval):
+        """Renvoie l'entrée (hist, info, timestamp) si elle a moins de ``max_age`` secondes"""
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._clock() - entry['stored_at'] >= self._max_age:
+                del self._entries[key]
+                self._nbytes -= entry['nbytes']
+                self.stale += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def stats(self):
+        """Métriques du cache (entrées, mémoire, hits/misses, évictions)"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._nbytes,
+                'budget_bytes': self._budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,136 @@
+"""Pool de requêtes concurrentes pour l'historique et les infos yfinance"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from tracker.governor import GOVERNOR, RateLimitError, is_rate_limited
+from tracker.metrics import count_upstream
+
+
+def yf_history(symbol, period, interval, timeout):
+    """Récupère l'historique d'un symbole via yfinance"""
+    import yfinance as yf
+
+    with GOVERNOR.request('history'):
+        count_upstream('history')
+        return yf.Ticker(symbol).history(period=period, interval=interval, timeout=timeout)
+
+
+def yf_info(symbol, timeout=None):
+    """Récupère les informations d'un symbole (ticker.info) via yfinance"""
+    import yfinance as yf
+
+    with GOVERNOR.request('info'):
+        count_upstream('info')
+        return yf.Ticker(symbol).info
+
+
+@dataclass
+class FetchResult:
+    """Résultat (éventuellement partiel) d'une récupération pour un symbole"""
+    symbol: str
+    hist: object = None
+    info: dict = None
+    errors: dict = field(default_factory=dict)
+    timed_out: tuple = ()
+
+    @property
+    def has_history(self):
+        return self.hist is not None and not self.hist.empty
+
+    @property
+    def rate_limited(self):
+        return any(is_rate_limited(e) for e in self.errors.values())
+
+
+class FetchPool:
+    """Exécute les requêtes historique + info en parallèle, avec délai maximal et retry hors thread de rendu
+
+    Les tentatives et le backoff exponentiel (1s, 2s, 4s...) s'exécutent dans les
+    threads du pool : le thread Streamlit attend au plus ``deadline`` secondes
+    l'historique, et les infos au plus ``info_deadline`` secondes depuis le début de
+    l'appel, puis repart avec ce qui est disponible (par exemple l'historique sans
+    les infos). Des infos arrivées après leur délai sont remises à ``on_info(symbol, info)``.
+    """
+
+    def __init__(self, max_workers=8, retry_count=3, backoff=1.0, request_timeout=10,
+                 info_deadline=3, history_fn=None, info_fn=None, on_info=None, sleep=time.sleep):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        self._retry_count = retry_count
+        self._backoff = backoff
+        self._request_timeout = request_timeout
+        self._info_deadline = info_deadline
+        self._on_info = on_info
+        self._history_fn = history_fn or yf_history
+        self._info_fn = info_fn or yf_info
+        self._sleep = sleep
+
+    def _with_retry(self, fn, *args):
+        last_error = None
+        for attempt in range(self._retry_count):
+            if attempt > 0:
+                self._sleep(self._backoff * 2 ** (attempt - 1))
+            try:
+                return fn(*args)
+            except RateLimitError:
+                # Refus du gouverneur : réessayer ne ferait que rallonger la file
+                raise
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def submit(self, symbol, period, interval, with_info=True):
+        """Lance la récupération sans attendre ; renvoie les futures par nature de requête"""
+        futures = {
+            'hist': self._executor.submit(
+                self._with_retry, self._history_fn,
+                symbol, period, interval, self._request_timeout
+            )
+        }
+        if with_info:
+            futures['info'] = self._executor.submit(
+                self._with_retry, self._info_fn,
+                symbol, self._request_timeout
+            )
+        return futures
+
+    def fetch(self, symbol, period, interval, deadline=15, with_info=True):
+        """Récupère historique et infos d'un symbole en parallèle, résultat partiel si délai dépassé"""
+        return self.fetch_many([symbol], period, interval, deadline, with_info)[symbol]
+
+    def fetch_many(self, symbols, period, interval, deadline=15, with_info=True):
+        """Récupère plusieurs symboles en parallèle ; l'historique n'attend jamais les infos"""
+        start = time.monotonic()
+        pending = {sym: self.submit(sym, period, interval, with_info) for sym in symbols}
+        wait([futures['hist'] for futures in pending.values()], timeout=deadline)
+        # Les infos n'ont que le reste de leur propre délai, plus court : souvent déjà écoulé
+        info_futures = [futures['info'] for futures in pending.values() if 'info' in futures]
+        if info_futures:
+            info_timeout = min(self._info_deadline, deadline) - (time.monotonic() - start)
+            wait(info_futures, timeout=max(0.0, info_timeout))
+
+        results = {}
+        for sym, futures in pending.items():
+            result = FetchResult(sym)
+            timed_out = []
+            for kind, future in futures.items():
+                if not future.done():
+                    timed_out.append(kind)
+                    if kind == 'info' and self._on_info is not None:
+                        future.add_done_callback(lambda f, sym=sym: self._deliver_info(sym, f))
+                    continue
+                error = future.exception()
+                if error is not None:
+                    result.errors[kind] = error
+                else:
+                    setattr(result, kind, future.result())
+            result.timed_out = tuple(timed_out)
+            results[sym] = result
+        return results
+
+    def _deliver_info(self, symbol, future):
+        if not future.cancelled() and future.exception() is None and future.result():
+            self._on_info(symbol, future.result())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
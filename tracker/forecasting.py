@@ -0,0 +1,105 @@
+"""Prévision de rendement à partir de l'historique OHLCV (scikit-learn importé à la demande)"""
+import numpy as np
+import pandas as pd
+
+MODELS = {
+    'linear': "Régression linéaire",
+    'poly2': "Régression polynomiale (degré 2)",
+}
+
+LAGS = (1, 2, 3, 5, 10)
+
+
+def build_features(hist, horizon=1):
+    """Construit les variables explicatives (vectorisé) et la cible : rendement à ``horizon`` barres
+
+    Renvoie (X, y) : X contient toutes les lignes exploitables (y compris les plus
+    récentes, dont la cible est encore inconnue et vaut NaN).
+    """
+    close = hist['Close'].to_numpy(dtype=float)
+    volume = hist['Volume'].to_numpy(dtype=float)
+    log_close = np.log(close)
+    ret = np.concatenate(([np.nan], np.diff(log_close)))
+    s = pd.Series(ret, index=hist.index)
+    c = pd.Series(close, index=hist.index)
+
+    features = {f'ret_lag{k}': s.shift(k - 1) for k in LAGS}
+    features['vol_5'] = s.rolling(5).std()
+    features['vol_20'] = s.rolling(20).std()
+    sma5, sma20, sma50 = c.rolling(5).mean(), c.rolling(20).mean(), c.rolling(50).mean()
+    features['spread_close_sma20'] = c / sma20 - 1
+    features['spread_sma5_sma20'] = sma5 / sma20 - 1
+    features['spread_sma20_sma50'] = sma20 / sma50 - 1
+    log_vol = pd.Series(np.log1p(volume), index=hist.index)
+    features['volume_z20'] = (log_vol - log_vol.rolling(20).mean()) / log_vol.rolling(20).std()
+
+    X = pd.DataFrame(features).replace([np.inf, -np.inf], np.nan)
+    y = pd.Series(np.roll(log_close, -horizon) - log_close, index=hist.index, name='target')
+    y.iloc[len(y) - horizon:] = np.nan
+
+    valid = X.notna().all(axis=1)
+    return X[valid], y[valid]
+
+
+def make_model(kind='linear'):
+    """Crée le pipeline scikit-learn (import différé)"""
+    from sklearn.linear_model import LinearRegression, Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
+    if kind == 'poly2':
+        return make_pipeline(StandardScaler(), PolynomialFeatures(degree=2), Ridge(alpha=1.0))
+    return make_pipeline(StandardScaler(), LinearRegression())
+
+
+def fit_model(X, y, kind='linear'):
+    """Entraîne le modèle sur les lignes dont la cible est connue"""
+    known = y.notna()
+    if known.sum() < 30:
+        raise ValueError("Historique insuffisant pour entraîner le modèle (30 observations minimum)")
+    model = make_model(kind)
+    model.fit(X[known].to_numpy(), y[known].to_numpy())
+    return model
+
+
+def predict_next(model, X, last_close, horizon=1):
+    """Prévision du rendement et du prix à ``horizon`` barres à partir de la dernière ligne"""
+    predicted_return = float(model.predict(X.iloc[[-1]].to_numpy())[0])
+    return predicted_return, float(last_close * np.exp(predicted_return))
+
+
+def walk_forward_backtest(X, y, kind='linear', n_splits=5, min_train=60, horizon=1):
+    """Backtest walk-forward : entraînement sur le passé, test sur la tranche suivante
+
+    Renvoie (prédictions hors échantillon, métriques). Les rendements cumulés ne
+    comptent qu'une position tous les ``horizon`` pas pour éviter les chevauchements.
+    """
+    known = y.notna()
+    X, y = X[known], y[known]
+    n = len(y)
+    if n < min_train + n_splits:
+        raise ValueError("Historique insuffisant pour le backtest")
+
+    bounds = np.linspace(min_train, n, n_splits + 1).astype(int)
+    preds = pd.Series(np.nan, index=y.index, name='prediction')
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end <= start:
+            continue
+        model = make_model(kind)
+        # Les ``horizon`` dernières cibles du train chevauchent la tranche de test
+        train_end = max(start - horizon + 1, 1)
+        model.fit(X.iloc[:train_end].to_numpy(), y.iloc[:train_end].to_numpy())
+        preds.iloc[start:end] = model.predict(X.iloc[start:end].to_numpy())
+
+    tested = preds.notna()
+    p, actual = preds[tested].to_numpy(), y[tested].to_numpy()
+    strategy = (np.sign(p) * actual)[::horizon]
+    metrics = {
+        'observations': int(tested.sum()),
+        'hit_rate': float(np.mean(np.sign(p) == np.sign(actual))),
+        'mae': float(np.mean(np.abs(p - actual))),
+        'rmse': float(np.sqrt(np.mean((p - actual) ** 2))),
+        'strategy_return': float(np.expm1(strategy.sum())),
+        'buy_hold_return': float(np.expm1(actual[::horizon].sum())),
+    }
+    return pd.DataFrame({'prediction': preds[tested], 'actual': y[tested]}), metrics
@@ -0,0 +1,95 @@
+"""Cache longue durée des informations société (ticker.info)"""
+import json
+import os
+import threading
+import time
+
+from tracker.fetch_pool import yf_info
+
+# Champs de ticker.info utilisés par le tableau de bord
+FUNDAMENTAL_KEYS = (
+    'longName', 'shortName', 'sector', 'industry', 'website', 'currency',
+    'marketCap', 'trailingPE', 'forwardPE', 'dividendYield', 'beta',
+    'fiftyTwoWeekHigh', 'fiftyTwoWeekLow', 'sharesOutstanding',
+)
+
+
+def slim_info(info):
+    """Ne conserve que les champs fondamentaux sérialisables"""
+    return {k: info[k] for k in FUNDAMENTAL_KEYS if info.get(k) is not None}
+
+
+class FundamentalsCache:
+    """Cache des fondamentaux indexé uniquement par symbole, TTL en heures, stockage disque optionnel
+
+    Changer de période ou d'intervalle ne déclenche donc jamais un nouveau
+    téléchargement des métadonnées société.
+    """
+
+    def __init__(self, fetcher=None, ttl=6 * 3600, store_dir=None, clock=time.time):
+        self._fetcher = fetcher or yf_info
+        self._ttl = ttl
+        self._store_dir = store_dir
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+
+    def _path(self, symbol):
+        return os.path.join(self._store_dir, f"{symbol.replace('/', '_')}.json")
+
+    def _load_from_disk(self, symbol):
+        if not self._store_dir:
+            return None
+        try:
+            with open(self._path(symbol), encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry['fetched_at'], entry['info']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_to_disk(self, symbol, fetched_at, info):
+        if not self._store_dir:
+            return
+        tmp = self._path(symbol) + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': fetched_at, 'info': info}, f)
+            os.replace(tmp, self._path(symbol))
+        except (OSError, TypeError):
+            pass
+
+    def peek(self, symbol):
+        """Renvoie les fondamentaux encore valides sans appel réseau, sinon None"""
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                entry = self._load_from_disk(symbol)
+                if entry is not None:
+                    self._entries[symbol] = entry
+        if entry is None or self._clock() - entry[0] >= self._ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, symbol, info):
+        """Enregistre des fondamentaux fraîchement récupérés"""
+        if not info:
+            return
+        info = slim_info(info)
+        fetched_at = self._clock()
+        with self._lock:
+            self._entries[symbol] = (fetched_at, info)
+        self._write_to_disk(symbol, fetched_at, info)
+
+    def get(self, symbol):
+        """Renvoie les fondamentaux d'un symbole, en les téléchargeant seulement si expirés"""
+        info = self.peek(symbol)
+        if info is not None:
+            return info
+        self.put(symbol, self._fetcher(symbol))
+        return self.peek(symbol)
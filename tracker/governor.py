@@ -0,0 +1,263 @@
+"""Gouverneur des requêtes yfinance : seau à jetons, files prioritaires et disjoncteur
+
+Tous les appels réseau yfinance (history, info, download) passent par
+``GOVERNOR.request(...)``. Le seau à jetons lisse le débit sous les limites de
+Yahoo ; quand il est vide, les demandes attendent dans une file ordonnée par
+priorité (le symbole affiché passe avant le rafraîchissement de la watchlist).
+Après des 429 répétés, le disjoncteur refuse toute requête pendant ``cooldown``
+secondes : les appelants servent alors leurs données en cache.
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from tracker.metrics import REGISTRY
+
+logger = logging.getLogger('tracker.governor')
+
+# Files d'attente, de la plus prioritaire à la moins prioritaire
+LANES = ('interactive', 'background')
+
+# Attente maximale dans la file avant rejet, en secondes
+MAX_WAIT = {'interactive': 20.0, 'background': 2.0}
+
+# Yahoo ne publie pas ses limites : ~60 requêtes/min en continu, par rafales de 20,
+# restent sous le seuil à partir duquel les 429 apparaissent
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 20
+
+
+class RateLimitError(Exception):
+    """Requête refusée localement par le gouverneur (jamais envoyée à Yahoo)"""
+
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RateLimitError):
+    """Disjoncteur ouvert après des 429 : utiliser le cache jusqu'à la fin du refroidissement"""
+
+
+class QueueTimeoutError(RateLimitError):
+    """Attente d'un jeton plus longue que ``MAX_WAIT`` pour la file"""
+
+
+def is_rate_limited(error):
+    """Indique si une erreur correspond à une limite de requêtes (HTTP 429 ou refus du gouverneur)"""
+    if isinstance(error, RateLimitError):
+        return True
+    text = str(error)
+    return "429" in text or "Too Many Requests" in text
+
+
+class TokenBucket:
+    """Seau de ``burst`` jetons rechargé à ``rate`` jetons par seconde (non thread-safe)
+
+    Une requête plus coûteuse que le seau (téléchargement groupé) passe dès que le
+    seau est plein et le laisse en négatif : les suivantes attendent d'autant.
+    """
+
+    def __init__(self, rate, burst, clock):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._stamp = clock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    @property
+    def tokens(self):
+        self._refill(self._clock())
+        return self._tokens
+
+    def take(self, cost=1):
+        """Consomme ``cost`` jetons ; sinon renvoie le délai (s) avant de pouvoir le faire"""
+        self._refill(self._clock())
+        needed = min(cost, self.burst)
+        if self._tokens >= needed:
+            self._tokens -= cost
+            return 0.0
+        return (needed - self._tokens) / self.rate
+
+    def drain(self):
+        """Vide le seau (réponse 429 : Yahoo estime qu'on a déjà trop demandé)"""
+        self._refill(self._clock())
+        self._tokens = min(self._tokens, 0.0)
+
+
+class RequestGovernor:
+    """Point de passage unique des requêtes yfinance du processus (thread-safe)
+
+    ``request(endpoint, lane)`` attend un jeton dans sa file, puis observe l'issue
+    de l'appel : ``failure_threshold`` 429 consécutifs ouvrent le disjoncteur pour
+    ``cooldown`` secondes. À l'expiration, une seule requête d'essai passe ; son
+    succès referme le disjoncteur, un nouveau 429 le rouvre.
+
+    La file par défaut d'un appel peut être remplacée pour le thread courant avec
+    ``with governor.lane('interactive'):``.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_wait=None, failure_threshold=2,
+                 cooldown=60, registry=REGISTRY, clock=time.monotonic):
+        self._clock = clock
+        self._bucket = TokenBucket(rate, burst, clock)
+        self._max_wait = dict(MAX_WAIT, **(max_wait or {}))
+        self._threshold = failure_threshold
+        self._cooldown = cooldown
+        self._registry = registry
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self._failures = 0
+        self._open_until = None
+        self._probing = False
+        self.trips = 0
+
+    @property
+    def rate(self):
+        """Débit soutenu, en jetons par seconde"""
+        return self._bucket.rate
+
+    def set_max_wait(self, lane, seconds):
+        """Change l'attente maximale d'une file (par exemple pour un service sans utilisateur)"""
+        with self._cond:
+            self._max_wait[lane] = float(seconds)
+
+    @contextmanager
+    def lane(self, name):
+        """Force la file des requêtes émises par le thread courant"""
+        previous = getattr(self._local, 'lane', None)
+        self._local.lane = name
+        try:
+            yield
+        finally:
+            self._local.lane = previous
+
+    @contextmanager
+    def request(self, endpoint, lane='interactive', cost=1):
+        """Encadre un appel réseau : lève ``RateLimitError`` si le gouverneur le refuse"""
+        lane = getattr(self._local, 'lane', None) or lane
+        probe = self._admit(endpoint, lane, cost)
+        try:
+            yield
+        except Exception as e:
+            self._record(probe, e)
+            raise
+        else:
+            self._record(probe, None)
+
+    def _reject(self, error, lane, reason):
+        self._registry.incr('governor_rejected_total', lane=lane, reason=reason)
+        raise error
+
+    def _check_circuit(self, lane):
+        """Sous verrou : lève si le disjoncteur est ouvert ; renvoie True pour la requête d'essai"""
+        if self._open_until is None:
+            return False
+        remaining = self._open_until - self._clock()
+        if remaining > 0:
+            self._reject(CircuitOpenError(f"Too Many Requests: disjoncteur ouvert encore {remaining:.0f}s",
+                                          remaining), lane, 'circuit_open')
+        if self._probing:
+            self._reject(CircuitOpenError("Too Many Requests: requête d'essai en cours", 1.0),
+                         lane, 'circuit_open')
+        self._probing = True
+        return True
+
+    def _admit(self, endpoint, lane, cost):
+        priority = LANES.index(lane)
+        start = self._clock()
+        deadline = start + self._max_wait[lane]
+        with self._cond:
+            probe = self._check_circuit(lane)
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    delay = self._bucket.take(cost) if self._queue[0] == entry else None
+                    if delay == 0:
+                        heapq.heappop(self._queue)
+                        break
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self._reject(QueueTimeoutError(
+                            f"Too Many Requests: pas de jeton en {self._max_wait[lane]:g}s ({endpoint})",
+                            delay or 0.0), lane, 'queue_timeout')
+                    # La tête attend le prochain jeton, les autres qu'elle libère sa place
+                    self._cond.wait(remaining if delay is None else min(delay, remaining))
+            except RateLimitError:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._probing = self._probing and not probe
+                raise
+            finally:
+                self._cond.notify_all()
+
+        waited = self._clock() - start
+        self._registry.incr('governor_requests_total', lane=lane, endpoint=endpoint)
+        self._registry.observe('governor_wait_seconds', waited, lane=lane)
+        if waited > 0.001:
+            self._registry.incr('governor_delayed_total', lane=lane)
+        return probe
+
+    def _record(self, probe, error):
+        with self._cond:
+            if error is not None and is_rate_limited(error):
+                self._failures += 1
+                self._bucket.drain()
+                if probe or self._failures >= self._threshold:
+                    self._open_until = self._clock() + self._cooldown
+                    self.trips += 1
+                    self._registry.incr('governor_circuit_trips_total')
+                    logger.warning("Disjoncteur yfinance ouvert pour %ss après %d réponse(s) 429",
+                                   self._cooldown, self._failures)
+            elif error is None:
+                self._failures = 0
+                self._open_until = None
+            if probe:
+                self._probing = False
+            self._cond.notify_all()
+
+    def retry_after(self):
+        """Secondes avant la fin du refroidissement (0 si le disjoncteur est fermé)"""
+        with self._cond:
+            if self._open_until is None:
+                return 0.0
+            return max(0.0, self._open_until - self._clock())
+
+    def stats(self):
+        with self._cond:
+            depth = {lane: 0 for lane in LANES}
+            for priority, _ in self._queue:
+                depth[LANES[priority]] += 1
+            return {
+                'queue_depth': depth,
+                'tokens': self._bucket.tokens,
+                'circuit_open': self._open_until is not None,
+                'retry_after': max(0.0, self._open_until - self._clock()) if self._open_until else 0.0,
+                'trips': self.trips,
+            }
+
+    def gauges(self):
+        """Collecteur pour ``MetricsRegistry`` : profondeur des files, jetons, état du disjoncteur"""
+        stats = self.stats()
+        samples = [('governor_queue_depth', {'lane': lane}, n) for lane, n in stats['queue_depth'].items()]
+        samples.append(('governor_tokens', {}, round(stats['tokens'], 2)))
+        samples.append(('governor_circuit_open', {}, int(stats['circuit_open'])))
+        return samples
+
+
+GOVERNOR = RequestGovernor(
+    rate=float(os.environ.get('TRACKER_YF_RATE', DEFAULT_RATE)),
+    burst=int(os.environ.get('TRACKER_YF_BURST', DEFAULT_BURST)),
+)
+REGISTRY.register_collector(GOVERNOR.gauges)
@@ -0,0 +1,336 @@
+"""Moteur d'indicateurs techniques vectorisé, avec mise à jour incrémentale barre par barre"""
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_CONFIG = {
+    'sma': (20, 50),
+    'ema': (20,),
+    'rsi': 14,
+    'macd': (12, 26, 9),
+    'bollinger': (20, 2.0),
+    'atr': 14,
+    'vwap': True,
+}
+
+INTRADAY_INTERVALS = ("1m", "5m", "15m", "30m", "1h")
+
+
+def _nan(n):
+    return np.full(n, np.nan)
+
+
+def sma(x, n):
+    """Moyenne mobile simple (sommes cumulées, O(n))"""
+    out = _nan(len(x))
+    if len(x) >= n:
+        c = np.cumsum(np.concatenate(([0.0], x)))
+        out[n - 1:] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def rolling_std(x, n, chunk=1 << 16):
+    """Écart-type glissant (population), calculé par blocs pour borner la mémoire"""
+    out = _nan(len(x))
+    if len(x) >= n:
+        windows = sliding_window_view(x, n)
+        for start in range(0, len(windows), chunk):
+            out[n - 1 + start:n - 1 + start + chunk] = windows[start:start + chunk].std(axis=1)
+    return out
+
+
+def ema(x, alpha):
+    """Moyenne exponentielle récursive (e = a*x + (1-a)*e_prec), amorcée sur la première valeur"""
+    if len(x) == 0:
+        return np.empty(0)
+    return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy(copy=True)
+
+
+def span_alpha(span):
+    return 2.0 / (span + 1.0)
+
+
+def true_range(high, low, close):
+    """True range ; la première barre vaut high - low"""
+    prev_close = np.concatenate(([close[0]], close[:-1])) if len(close) else close
+    return np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+
+
+def session_vwap(high, low, close, volume, session_keys=None):
+    """VWAP cumulé, remis à zéro à chaque changement de ``session_keys`` (ou sur toute la série)"""
+    pv = (high + low + close) / 3.0 * volume
+    cpv = np.cumsum(pv)
+    cv = np.cumsum(volume)
+    if session_keys is not None and len(session_keys):
+        starts = np.flatnonzero(np.concatenate(([True], session_keys[1:] != session_keys[:-1])))
+        lengths = np.diff(np.concatenate((starts, [len(pv)])))
+        base_pv = np.repeat(np.concatenate(([0.0], cpv))[starts], lengths)
+        base_v = np.repeat(np.concatenate(([0.0], cv))[starts], lengths)
+        cpv = cpv - base_pv
+        cv = cv - base_v
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(cv > 0, cpv / cv, np.nan)
+
+
+class IncrementalState:
+    """État glissant permettant d'ajouter une barre en O(1) (indépendant de la longueur d'historique)"""
+
+    def __init__(self, config):
+        self.config = config
+        self.n = 0
+        self.windows = {}
+        self.emas = {}
+        self.prev_close = None
+        self.rsi_gain = self.rsi_loss = None
+        self.macd = None
+        self.atr = None
+        self.vwap_key = None
+        self.vwap_pv = self.vwap_v = 0.0
+
+    def update(self, o, h, l, c, v, session_key=None):
+        """Ajoute une barre et renvoie les valeurs d'indicateurs correspondantes"""
+        cfg = self.config
+        out = {}
+        self.n += 1
+
+        for n in cfg.get('sma', ()):
+            w = self.windows.setdefault(n, deque(maxlen=n))
+            w.append(c)
+            out[f'SMA {n}'] = sum(w) / n if len(w) == n else np.nan
+
+        for span in cfg.get('ema', ()):
+            prev = self.emas.get(span)
+            a = span_alpha(span)
+            self.emas[span] = c if prev is None else a * c + (1 - a) * prev
+            out[f'EMA {span}'] = self.emas[span]
+
+        if cfg.get('rsi'):
+            n = cfg['rsi']
+            if self.prev_close is None:
+                out[f'RSI {n}'] = np.nan
+            else:
+                delta = c - self.prev_close
+                gain, loss = max(delta, 0.0), max(-delta, 0.0)
+                a = 1.0 / n
+                if self.rsi_gain is None:
+                    self.rsi_gain, self.rsi_loss = gain, loss
+                else:
+                    self.rsi_gain = a * gain + (1 - a) * self.rsi_gain
+                    self.rsi_loss = a * loss + (1 - a) * self.rsi_loss
+                out[f'RSI {n}'] = _rsi_value(self.rsi_gain, self.rsi_loss) if self.n > n else np.nan
+
+        if cfg.get('macd'):
+            fast, slow, signal = cfg['macd']
+            if self.macd is None:
+                self.macd = [c, c, 0.0]
+            else:
+                af, asl, asg = span_alpha(fast), span_alpha(slow), span_alpha(signal)
+                self.macd[0] = af * c + (1 - af) * self.macd[0]
+                self.macd[1] = asl * c + (1 - asl) * self.macd[1]
+                self.macd[2] = asg * (self.macd[0] - self.macd[1]) + (1 - asg) * self.macd[2]
+            line = self.macd[0] - self.macd[1]
+            out['MACD'], out['MACD signal'], out['MACD hist'] = line, self.macd[2], line - self.macd[2]
+
+        if cfg.get('bollinger'):
+            n, k = cfg['bollinger']
+            w = self.windows.setdefault(('bb', n), deque(maxlen=n))
+            w.append(c)
+            if len(w) == n:
+                arr = np.fromiter(w, float, n)
+                mid, sd = arr.mean(), arr.std()
+                out['BB mid'], out['BB upper'], out['BB lower'] = mid, mid + k * sd, mid - k * sd
+            else:
+                out['BB mid'] = out['BB upper'] = out['BB lower'] = np.nan
+
+        if cfg.get('atr'):
+            n = cfg['atr']
+            tr = h - l if self.prev_close is None else max(
+                h - l, abs(h - self.prev_close), abs(l - self.prev_close))
+            self.atr = tr if self.atr is None else tr / n + (1 - 1.0 / n) * self.atr
+            out[f'ATR {n}'] = self.atr if self.n >= n else np.nan
+
+        if cfg.get('vwap'):
+            if session_key != self.vwap_key:
+                self.vwap_key, self.vwap_pv, self.vwap_v = session_key, 0.0, 0.0
+            self.vwap_pv += (h + l + c) / 3.0 * v
+            self.vwap_v += v
+            out['VWAP'] = self.vwap_pv / self.vwap_v if self.vwap_v > 0 else np.nan
+
+        self.prev_close = c
+        return out
+
+
+def _rsi_value(gain, loss):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = np.divide(gain, loss)
+        return np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+
+
+def compute_indicators(o, h, l, c, v, session_keys=None, config=None):
+    """Calcule tous les indicateurs en une passe vectorisée ; renvoie (colonnes, état incrémental)"""
+    cfg = config or DEFAULT_CONFIG
+    o, h, l, c, v = (np.asarray(a, dtype=float) for a in (o, h, l, c, v))
+    size = len(c)
+    cols = {}
+    state = IncrementalState(cfg)
+    state.n = size
+    if size == 0:
+        return cols, state
+
+    for n in cfg.get('sma', ()):
+        cols[f'SMA {n}'] = sma(c, n)
+        state.windows[n] = deque(c[-n:], maxlen=n)
+
+    for span in cfg.get('ema', ()):
+        cols[f'EMA {span}'] = ema(c, span_alpha(span))
+        state.emas[span] = cols[f'EMA {span}'][-1]
+
+    if cfg.get('rsi'):
+        n = cfg['rsi']
+        rsi = _nan(size)
+        if size > 1:
+            delta = np.diff(c)
+            avg_gain = ema(np.maximum(delta, 0.0), 1.0 / n)
+            avg_loss = ema(np.maximum(-delta, 0.0), 1.0 / n)
+            rsi[1:] = _rsi_value(avg_gain, avg_loss)
+            rsi[:n] = np.nan
+            state.rsi_gain, state.rsi_loss = avg_gain[-1], avg_loss[-1]
+        cols[f'RSI {n}'] = rsi
+
+    if cfg.get('macd'):
+        fast, slow, signal = cfg['macd']
+        ema_fast, ema_slow = ema(c, span_alpha(fast)), ema(c, span_alpha(slow))
+        line = ema_fast - ema_slow
+        sig = ema(line, span_alpha(signal))
+        cols['MACD'], cols['MACD signal'], cols['MACD hist'] = line, sig, line - sig
+        state.macd = [ema_fast[-1], ema_slow[-1], sig[-1]]
+
+    if cfg.get('bollinger'):
+        n, k = cfg['bollinger']
+        mid, sd = sma(c, n), rolling_std(c, n)
+        cols['BB mid'], cols['BB upper'], cols['BB lower'] = mid, mid + k * sd, mid - k * sd
+        state.windows[('bb', n)] = deque(c[-n:], maxlen=n)
+
+    if cfg.get('atr'):
+        n = cfg['atr']
+        atr = ema(true_range(h, l, c), 1.0 / n)
+        state.atr = atr[-1]
+        atr[:n - 1] = np.nan
+        cols[f'ATR {n}'] = atr
+
+    if cfg.get('vwap'):
+        keys = None if session_keys is None else np.asarray(session_keys)
+        cols['VWAP'] = session_vwap(h, l, c, v, keys)
+        if keys is None:
+            state.vwap_pv, state.vwap_v = float(np.sum((h + l + c) / 3.0 * v)), float(np.sum(v))
+        else:
+            last = keys[-1]
+            mask = keys == last
+            state.vwap_key = last
+            state.vwap_pv = float(np.sum(((h + l + c) / 3.0 * v)[mask]))
+            state.vwap_v = float(np.sum(v[mask]))
+
+    state.prev_close = c[-1]
+    return cols, state
+
+
+def session_keys_for(index, interval):
+    """Clé de séance (jour) pour le VWAP intraday ; None pour les intervalles journaliers et plus"""
+    if interval not in INTRADAY_INTERVALS or len(index) == 0:
+        return None
+    return index.normalize().asi8
+
+
+class _Columns:
+    """Colonnes numpy extensibles (capacité doublée) pour des ajouts en O(1) amorti"""
+
+    def __init__(self, cols):
+        self.size = len(next(iter(cols.values()))) if cols else 0
+        capacity = max(16, self.size * 2)
+        self.data = {}
+        for name, arr in cols.items():
+            buf = np.empty(capacity)
+            buf[:self.size] = arr
+            self.data[name] = buf
+
+    def append(self, row):
+        if self.data and self.size == len(next(iter(self.data.values()))):
+            for name, buf in self.data.items():
+                grown = np.empty(len(buf) * 2)
+                grown[:self.size] = buf[:self.size]
+                self.data[name] = grown
+        for name, value in row.items():
+            self.data[name][self.size] = value
+        self.size += 1
+
+    def frame(self, index):
+        return pd.DataFrame({name: buf[:self.size] for name, buf in self.data.items()}, index=index)
+
+
+def _bar_values(hist, pos):
+    """Valeurs OHLCV de la barre ``pos`` (pour détecter une barre mise à jour sur place)"""
+    return np.array([hist[col].iat[pos] for col in ('Open', 'High', 'Low', 'Close', 'Volume')], dtype=float)
+
+
+class IndicatorEngine:
+    """Indicateurs mis en cache par (symbole, intervalle, dernière barre)
+
+    Même dernière barre (horodatage et valeurs OHLCV) : résultat en cache. Une seule
+    barre nouvelle après une dernière barre inchangée : mise à jour incrémentale de
+    l'état glissant. Sinon (barre en cours modifiée, historique recalé) : recalcul
+    vectorisé complet.
+    """
+
+    def __init__(self, config=None, max_entries=64):
+        self.config = config or DEFAULT_CONFIG
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self.full_computes = 0
+        self.incremental_updates = 0
+        self.hits = 0
+
+    def compute(self, symbol, interval, hist):
+        """Renvoie un DataFrame d'indicateurs aligné sur l'index de ``hist``"""
+        key = (symbol, interval)
+        index = hist.index
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                n = entry['columns'].size
+                if (len(index) == n and n > 0 and index[-1] == entry['last']
+                        and np.array_equal(_bar_values(hist, -1), entry['last_bar'], equal_nan=True)):
+                    self.hits += 1
+                    return entry['frame']
+                if (len(index) == n + 1 and n > 0 and index[-2] == entry['last']
+                        and np.array_equal(_bar_values(hist, -2), entry['last_bar'], equal_nan=True)):
+                    bar = hist.iloc[-1]
+                    keys = session_keys_for(index[-1:], interval)
+                    row = entry['state'].update(
+                        float(bar['Open']), float(bar['High']), float(bar['Low']),
+                        float(bar['Close']), float(bar['Volume']),
+                        None if keys is None else keys[0])
+                    entry['columns'].append(row)
+                    entry['last'] = index[-1]
+                    entry['last_bar'] = _bar_values(hist, -1)
+                    entry['frame'] = entry['columns'].frame(index)
+                    self.incremental_updates += 1
+                    return entry['frame']
+
+            cols, state = compute_indicators(
+                hist['Open'].to_numpy(), hist['High'].to_numpy(), hist['Low'].to_numpy(),
+                hist['Close'].to_numpy(), hist['Volume'].to_numpy(),
+                session_keys_for(index, interval), self.config)
+            columns = _Columns(cols)
+            frame = columns.frame(index)
+            self._entries[key] = {'last': index[-1] if len(index) else None,
+                                  'last_bar': _bar_values(hist, -1) if len(index) else None,
+                                  'columns': columns, 'state': state, 'frame': frame}
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self.full_computes += 1
+            return frame
@@ -0,0 +1,51 @@
+"""Imports paresseux : le module n'est réellement importé qu'au premier accès à un attribut"""
+import importlib
+import importlib.util
+import sys
+import threading
+
+
+class LazyModule:
+    """Mandataire d'un module importé au premier accès à l'un de ses attributs
+
+    Contrairement à ``importlib.util.LazyLoader`` (non thread-safe en 3.11 : des
+    threads de script concurrents voyaient un module à moitié chargé),
+    l'import passe par ``importlib.import_module`` sous un verrou.
+    """
+
+    __slots__ = ('_name', '_module', '_lock')
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'chargé' if self._module is not None else 'non chargé'
+        return f"<module paresseux {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Renvoie ``name`` sans l'importer tout de suite
+
+    Les modules lourds propres à une section (plotly, scikit-learn via la
+    prévision, SMTP, pyarrow...) ne coûtent ainsi rien au premier affichage
+    tant que la section qui les utilise n'est pas ouverte.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    return LazyModule(name)
@@ -0,0 +1,186 @@
+"""Calendrier des marchés (KRX, NYSE) et politique d'actualisation selon les horaires"""
+from datetime import date, datetime, time as dtime, timedelta
+
+import pytz
+
+KOREA_TIMEZONE = pytz.timezone('Asia/Seoul')
+US_TIMEZONE = pytz.timezone('America/New_York')
+
+
+def _dates(*days):
+    return frozenset(date.fromisoformat(d) for d in days)
+
+
+# Jours fériés (marché fermé) indexés par année - à compléter chaque année
+KRX_HOLIDAYS = _dates(
+    # 2024
+    '2024-01-01', '2024-02-09', '2024-02-10', '2024-02-11', '2024-02-12',
+    '2024-03-01', '2024-04-10', '2024-05-01', '2024-05-06', '2024-05-15',
+    '2024-06-06', '2024-08-15', '2024-09-16', '2024-09-17', '2024-09-18',
+    '2024-10-01', '2024-10-03', '2024-10-09', '2024-12-25', '2024-12-31',
+    # 2025
+    '2025-01-01', '2025-01-27', '2025-01-28', '2025-01-29', '2025-01-30',
+    '2025-03-03', '2025-05-01', '2025-05-05', '2025-05-06', '2025-06-03',
+    '2025-06-06', '2025-08-15', '2025-10-03', '2025-10-06', '2025-10-07',
+    '2025-10-08', '2025-10-09', '2025-12-25', '2025-12-31',
+    # 2026
+    '2026-01-01', '2026-02-16', '2026-02-17', '2026-02-18', '2026-03-02',
+    '2026-05-01', '2026-05-05', '2026-05-25', '2026-06-03', '2026-08-17',
+    '2026-09-24', '2026-09-25', '2026-10-05', '2026-10-09', '2026-12-25',
+    '2026-12-31',
+    # 2027
+    '2027-01-01', '2027-02-08', '2027-02-09', '2027-03-01', '2027-05-05',
+    '2027-05-13', '2027-08-16', '2027-09-14', '2027-09-15', '2027-09-16',
+    '2027-10-04', '2027-10-11', '2027-12-27', '2027-12-31',
+)
+
+NYSE_HOLIDAYS = _dates(
+    # 2024
+    '2024-01-01', '2024-01-15', '2024-02-19', '2024-03-29', '2024-05-27',
+    '2024-06-19', '2024-07-04', '2024-09-02', '2024-11-28', '2024-12-25',
+    # 2025
+    '2025-01-01', '2025-01-09', '2025-01-20', '2025-02-17', '2025-04-18',
+    '2025-05-26', '2025-06-19', '2025-07-04', '2025-09-01', '2025-11-27',
+    '2025-12-25',
+    # 2026
+    '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25',
+    '2026-06-19', '2026-07-03', '2026-09-07', '2026-11-26', '2026-12-25',
+    # 2027
+    '2027-01-01', '2027-01-18', '2027-02-15', '2027-03-26', '2027-05-31',
+    '2027-06-18', '2027-07-05', '2027-09-06', '2027-11-25', '2027-12-24',
+)
+
+EXCHANGES = {
+    'KRX': {'tz': KOREA_TIMEZONE, 'open': dtime(9, 0), 'close': dtime(15, 30), 'holidays': KRX_HOLIDAYS},
+    'NYSE': {'tz': US_TIMEZONE, 'open': dtime(9, 30), 'close': dtime(16, 0), 'holidays': NYSE_HOLIDAYS},
+}
+
+
+def exchange_for_symbol(symbol):
+    """KRX pour les suffixes .KS/.KQ et les indices coréens, NYSE pour les ADR"""
+    if symbol.endswith(('.KS', '.KQ')) or symbol in ('^KS11', '^KQ11', '^KS200'):
+        return 'KRX'
+    return 'NYSE'
+
+
+def is_trading_day(exchange, day):
+    """Jour ouvré (ni week-end ni férié) pour un marché"""
+    return day.weekday() < 5 and day not in EXCHANGES[exchange]['holidays']
+
+
+def session_bounds(exchange, day):
+    """Début et fin de séance (datetimes localisés) pour un jour donné"""
+    cfg = EXCHANGES[exchange]
+    tz = cfg['tz']
+    return (tz.localize(datetime.combine(day, cfg['open'])),
+            tz.localize(datetime.combine(day, cfg['close'])))
+
+
+def session_state(exchange, now=None):
+    """Renvoie 'open', 'closed', 'weekend' ou 'holiday'"""
+    tz = EXCHANGES[exchange]['tz']
+    local = (now or datetime.now(pytz.utc)).astimezone(tz)
+    day = local.date()
+    if day.weekday() >= 5:
+        return 'weekend'
+    if day in EXCHANGES[exchange]['holidays']:
+        return 'holiday'
+    start, end = session_bounds(exchange, day)
+    return 'open' if start <= local <= end else 'closed'
+
+
+def next_session_start(exchange, now=None):
+    """Prochaine ouverture (strictement après ``now`` si le marché est déjà ouvert)"""
+    tz = EXCHANGES[exchange]['tz']
+    local = (now or datetime.now(pytz.utc)).astimezone(tz)
+    day = local.date()
+    for _ in range(30):
+        if is_trading_day(exchange, day):
+            start, _ = session_bounds(exchange, day)
+            if start > local:
+                return start
+        day += timedelta(days=1)
+    return None
+
+
+def last_session_end(exchange, now=None):
+    """Dernière clôture passée"""
+    tz = EXCHANGES[exchange]['tz']
+    local = (now or datetime.now(pytz.utc)).astimezone(tz)
+    day = local.date()
+    for _ in range(30):
+        if is_trading_day(exchange, day):
+            _, end = session_bounds(exchange, day)
+            if end <= local:
+                return end
+        day -= timedelta(days=1)
+    return None
+
+
+def get_market_status(now=None):
+    """Détermine le statut des marchés coréens"""
+    state = session_state('KRX', now)
+    if state == 'weekend':
+        return "Fermé (weekend)", "🔴"
+    if state == 'holiday':
+        return "Fermé (jour férié)", "🔴"
+    if state == 'open':
+        return "Ouvert", "🟢"
+    return "Fermé", "🔴"
+
+
+class RefreshPolicy:
+    """Relie cadence d'actualisation et durée de cache à l'état de séance de chaque marché
+
+    Pendant la séance (plus ``close_grace`` après la clôture, le temps que les cours
+    de clôture différés arrivent), on interroge à la cadence demandée. Hors séance,
+    les cotations sont figées : plus aucune requête jusqu'à la prochaine ouverture
+    (dans la limite de ``max_idle`` secondes).
+    """
+
+    def __init__(self, quote_ttl=60, close_grace=20 * 60, max_idle=3600):
+        self.quote_ttl_open = quote_ttl
+        self.close_grace = close_grace
+        self.max_idle = max_idle
+
+    def is_active(self, exchange, now=None):
+        """Marché ouvert, ou fermé depuis moins de ``close_grace`` secondes"""
+        now = now or datetime.now(pytz.utc)
+        if session_state(exchange, now) == 'open':
+            return True
+        end = last_session_end(exchange, now)
+        return end is not None and (now - end).total_seconds() < self.close_grace
+
+    def _exchanges(self, symbols):
+        return {exchange_for_symbol(s) for s in symbols} or {'KRX'}
+
+    def idle_seconds(self, symbols, now=None):
+        """Secondes avant qu'un des marchés concernés ne redevienne actif (0 s'il l'est déjà)"""
+        now = now or datetime.now(pytz.utc)
+        waits = []
+        for exchange in self._exchanges(symbols):
+            if self.is_active(exchange, now):
+                return 0
+            start = next_session_start(exchange, now)
+            if start is not None:
+                waits.append((start - now).total_seconds())
+        return min(min(waits, default=self.max_idle), self.max_idle)
+
+    def quote_ttl(self, symbols, now=None):
+        """Durée de cache des cotations : courte en séance, jusqu'à la réouverture sinon"""
+        return max(self.idle_seconds(symbols, now), self.quote_ttl_open)
+
+    def poll_interval(self, symbols, requested, now=None):
+        """Cadence d'interrogation effective pour un ensemble de symboles"""
+        return max(self.idle_seconds(symbols, now), requested)
+
+    def is_frozen(self, symbol, fetched_at, now=None):
+        """Vrai si les données ont été récupérées après la dernière clôture et que le marché dort"""
+        now = now or datetime.now(pytz.utc)
+        exchange = exchange_for_symbol(symbol)
+        if self.is_active(exchange, now):
+            return False
+        end = last_session_end(exchange, now)
+        if end is None:
+            return False
+        return fetched_at >= end.timestamp() + self.close_grace
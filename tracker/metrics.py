@@ -0,0 +1,203 @@
+"""Instrumentation des chemins chauds : compteurs, durées et export texte façon Prometheus
+
+Le registre est global au processus (toutes les sessions Streamlit et les threads
+du pool de téléchargement y écrivent). ``RunProfile`` mesure un rerun : durée de
+chaque section et différence des compteurs entre le début et la fin du rerun.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('tracker.metrics')
+
+PREFIX = 'tracker_'
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels)
+    return '{' + body + '}'
+
+
+class MetricsRegistry:
+    """Compteurs et résumés de durées (nombre, somme, max) étiquetés, thread-safe"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+        self._collectors = []
+
+    def incr(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            count, total, peak = self._timings.get(key, (0, 0.0, 0.0))
+            self._timings[key] = (count + 1, total + seconds, max(peak, seconds))
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.observe(name, self._clock() - start, **labels)
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def register_collector(self, collector):
+        """``collector() -> [(nom, {étiquettes}, valeur), ...]`` lu à chaque export (jauges des caches)"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def gauges(self):
+        with self._lock:
+            collectors = list(self._collectors)
+        samples = []
+        for collector in collectors:
+            try:
+                samples.extend(collector())
+            except Exception as e:
+                logger.warning("Collecteur de métriques en échec : %s", e)
+        return samples
+
+    def render_prometheus(self):
+        """Exposition au format texte Prometheus 0.0.4"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                lines.append(f'# TYPE {PREFIX}{name} counter')
+                seen.add(name)
+            lines.append(f'{PREFIX}{name}{_format_labels(labels)} {value}')
+        for (name, labels), (count, total, peak) in timings:
+            if name not in seen:
+                lines.append(f'# TYPE {PREFIX}{name} summary')
+                seen.add(name)
+            lines.append(f'{PREFIX}{name}_count{_format_labels(labels)} {count}')
+            lines.append(f'{PREFIX}{name}_sum{_format_labels(labels)} {total:.6f}')
+            lines.append(f'{PREFIX}{name}_max{_format_labels(labels)} {peak:.6f}')
+        for name, labels, value in self.gauges():
+            if name not in seen:
+                lines.append(f'# TYPE {PREFIX}{name} gauge')
+                seen.add(name)
+            lines.append(f'{PREFIX}{name}{_format_labels(tuple(sorted(labels.items())))} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        """Expose ``/metrics`` dans un thread démon ; renvoie le serveur HTTP"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+
+REGISTRY = MetricsRegistry()
+
+
+def count_upstream(endpoint):
+    """Un appel réseau yfinance (history, info, download)"""
+    REGISTRY.incr('yfinance_calls_total', endpoint=endpoint)
+
+
+class RunProfile:
+    """Mesures d'un rerun : sections chronométrées, octets envoyés et deltas des compteurs
+
+    Les deltas sont calculés sur le registre global : avec plusieurs sessions
+    simultanées ils incluent aussi les appels des autres spectateurs.
+    """
+
+    def __init__(self, registry=REGISTRY, clock=time.perf_counter):
+        self._registry = registry
+        self._clock = clock
+        self._start = clock()
+        self._baseline = registry.counters()
+        self.sections = {}
+        self.payload_bytes = {}
+        self._open = {}
+
+    def _record(self, name, elapsed):
+        self.sections[name] = self.sections.get(name, 0.0) + elapsed
+        self._registry.observe('section_seconds', elapsed, section=name)
+
+    @contextmanager
+    def section(self, name):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self._record(name, self._clock() - start)
+
+    def begin(self, name):
+        """Ouvre une section qui couvre un long bloc de script (fermée par ``end``)"""
+        self._open[name] = self._clock()
+
+    def end(self, name):
+        start = self._open.pop(name, None)
+        if start is not None:
+            self._record(name, self._clock() - start)
+
+    def add_bytes(self, kind, size):
+        self.payload_bytes[kind] = self.payload_bytes.get(kind, 0) + size
+        self._registry.incr('payload_bytes_total', size, kind=kind)
+
+    def counter_deltas(self):
+        deltas = {}
+        for key, value in self._registry.counters().items():
+            delta = value - self._baseline.get(key, 0)
+            if delta:
+                deltas[key] = delta
+        return deltas
+
+    def summary(self):
+        total = self._clock() - self._start
+        deltas = self.counter_deltas()
+        return {
+            'total_ms': round(total * 1000, 1),
+            'sections_ms': {k: round(v * 1000, 1) for k, v in self.sections.items()},
+            'process_yfinance_calls': sum(v for (name, _), v in deltas.items() if name == 'yfinance_calls_total'),
+            'counters': {name + _format_labels(labels): v for (name, labels), v in deltas.items()
+                         if name != 'payload_bytes_total'},
+            'payload_bytes': dict(self.payload_bytes),
+        }
+
+    def finish(self):
+        """Clôt le rerun : durée totale dans le registre et ligne de log JSON"""
+        summary = self.summary()
+        self._registry.observe('rerun_seconds', summary['total_ms'] / 1000)
+        logger.info(json.dumps({'event': 'rerun', **summary}, ensure_ascii=False))
+        return summary
@@ -0,0 +1,173 @@
+"""Envoi des notifications email (utilisable hors Streamlit)"""
+import queue
+import smtplib
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+# Chiffrement de la session SMTP : selon l'annonce du serveur, toujours ou jamais
+STARTTLS_MODES = ('auto', 'always', 'never')
+
+
+def build_message(subject, body, from_email, to_email):
+    """Construit un email HTML"""
+    msg = MIMEMultipart()
+    msg['From'] = from_email
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    return msg
+
+
+def wants_starttls(server, mode):
+    """Indique s'il faut chiffrer la session : ``'auto'`` suit l'annonce EHLO du serveur"""
+    if mode == 'auto':
+        server.ehlo_or_helo_if_needed()
+        return server.has_extn('starttls')
+    return mode in (True, 'always')
+
+
+class NotificationQueue:
+    """File d'envoi en arrière-plan avec connexion SMTP réutilisée
+
+    - une seule connexion authentifiée, rouverte si le serveur l'a fermée et
+      fermée après ``idle_timeout`` secondes d'inactivité ;
+    - les notifications arrivées dans la même fenêtre de ``coalesce_window``
+      secondes pour un même destinataire partent en un seul email récapitulatif ;
+    - une même clé de déduplication n'est envoyée qu'une fois par ``dedup_ttl`` ;
+    - en cas d'échec, nouvelles tentatives avec backoff exponentiel.
+
+    ``config['starttls']`` vaut ``'auto'`` (par défaut), ``'always'`` ou ``'never'``.
+    """
+
+    def __init__(self, config, coalesce_window=2.0, dedup_ttl=900, retries=3, backoff=1.0,
+                 idle_timeout=60, smtp_factory=None, clock=time.monotonic, sleep=time.sleep):
+        self.config = dict(config)
+        self.coalesce_window = coalesce_window
+        self.dedup_ttl = dedup_ttl
+        self.retries = retries
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self._smtp_factory = smtp_factory or smtplib.SMTP
+        self._clock = clock
+        self._sleep = sleep
+        self._queue = queue.Queue()
+        self._recent = {}
+        self._server = None
+        self._last_used = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {'queued': 0, 'sent': 0, 'digests': 0, 'deduplicated': 0, 'failed': 0, 'connections': 0}
+
+    def submit(self, subject, body, to_email, dedup_key=None):
+        """Met une notification en file (non bloquant) ; renvoie False si elle est dédupliquée"""
+        now = self._clock()
+        with self._lock:
+            if dedup_key is not None:
+                sent_at = self._recent.get(dedup_key)
+                if sent_at is not None and now - sent_at < self.dedup_ttl:
+                    self.stats['deduplicated'] += 1
+                    return False
+                self._recent[dedup_key] = now
+            self.stats['queued'] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='notification-queue', daemon=True)
+                self._thread.start()
+        self._queue.put((subject, body, to_email))
+        return True
+
+    def flush(self, timeout=None):
+        """Attend que toutes les notifications en file aient été traitées"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self._close()
+                continue
+            batch = [first]
+            # Regroupe tout ce qui arrive pendant la fenêtre de coalescence
+            window_end = time.monotonic() + self.coalesce_window
+            while True:
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                for to_email, items in self._group(batch).items():
+                    self._deliver(to_email, items)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            self._purge_recent()
+
+    @staticmethod
+    def _group(batch):
+        grouped = {}
+        for subject, body, to_email in batch:
+            grouped.setdefault(to_email, []).append((subject, body))
+        return grouped
+
+    def _deliver(self, to_email, items):
+        if len(items) == 1:
+            subject, body = items[0]
+        else:
+            subject = f"🚨 {len(items)} alertes de prix"
+            body = "<hr>".join(f"<h3>{s}</h3>{b}" for s, b in items)
+        msg = build_message(subject, body, self.config['email'], to_email)
+
+        for attempt in range(self.retries):
+            if attempt > 0:
+                self._sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                self._connection().send_message(msg)
+                self.stats['sent'] += 1
+                if len(items) > 1:
+                    self.stats['digests'] += 1
+                self._last_used = self._clock()
+                return True
+            except Exception:
+                self._close()
+        self.stats['failed'] += 1
+        return False
+
+    def _connection(self):
+        if self._server is not None:
+            try:
+                self._server.noop()
+                return self._server
+            except Exception:
+                self._close()
+        server = self._smtp_factory(self.config['smtp_server'], self.config['smtp_port'], timeout=30)
+        if wants_starttls(server, self.config.get('starttls', 'auto')):
+            server.starttls()
+        if self.config.get('password'):
+            server.login(self.config['email'], self.config['password'])
+        self._server = server
+        self.stats['connections'] += 1
+        return server
+
+    def _close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def _purge_recent(self):
+        now = self._clock()
+        with self._lock:
+            for key in [k for k, t in self._recent.items() if now - t >= self.dedup_ttl]:
+                del self._recent[key]
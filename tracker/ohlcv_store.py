@@ -0,0 +1,192 @@
+"""Stockage local persistant des historiques OHLCV avec mise à jour incrémentale"""
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from tracker.governor import GOVERNOR, is_rate_limited
+from tracker.metrics import count_upstream
+
+# Périodes yfinance, de la plus courte à la plus longue
+PERIODS = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"]
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Nombre de séances pour les périodes exprimées en jours
+PERIOD_SESSIONS = {"1d": 1, "5d": 5}
+
+# Profondeur servie par Yahoo en intraday : au-delà, un ``start`` plus ancien renvoie un historique vide
+INTRADAY_LOOKBACK = {
+    "1m": pd.Timedelta(days=30),
+    "2m": pd.Timedelta(days=60),
+    "5m": pd.Timedelta(days=60),
+    "15m": pd.Timedelta(days=60),
+    "30m": pd.Timedelta(days=60),
+    "90m": pd.Timedelta(days=60),
+    "60m": pd.Timedelta(days=730),
+    "1h": pd.Timedelta(days=730),
+}
+
+
+def yf_history_range(symbol, interval, period=None, start=None, timeout=10):
+    """Télécharge une période complète, ou seulement les barres depuis ``start``"""
+    import yfinance as yf
+
+    with GOVERNOR.request('history'):
+        count_upstream('history')
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval, timeout=timeout)
+        return ticker.history(period=period, interval=interval, timeout=timeout)
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        try:
+            import fastparquet  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+
+def to_utc_index(df):
+    """Normalise l'index d'un historique en UTC"""
+    if df.index.tz is None:
+        df.index = df.index.tz_localize('UTC')
+    else:
+        df.index = df.index.tz_convert('UTC')
+    return df
+
+
+def slice_period(df, period):
+    """Extrait d'un historique complet la fenêtre correspondant à une période yfinance"""
+    if df is None or df.empty or period == "max":
+        return df
+    if period in PERIOD_SESSIONS:
+        sessions = df.index.normalize().unique()
+        start = sessions[-min(PERIOD_SESSIONS[period], len(sessions))]
+        return df.loc[df.index >= start]
+    start = df.index[-1] - PERIOD_OFFSETS[period]
+    return df.loc[df.index >= start]
+
+
+class OHLCVStore:
+    """Historique OHLCV par (symbole, intervalle) sur disque, complété de façon incrémentale
+
+    Un premier appel télécharge la période demandée ; les suivants ne récupèrent
+    que les barres postérieures au dernier horodatage stocké et les fusionnent.
+    Les périodes plus courtes que celle déjà couverte sont servies par simple
+    découpage du stock local. Format Parquet si pyarrow/fastparquet est installé,
+    pickle sinon. ``is_frozen(symbol, fetched_at)`` permet de sauter la mise à jour
+    quand le marché est fermé depuis la dernière récupération.
+    """
+
+    def __init__(self, root, fetcher=None, min_refresh=60, is_frozen=None, clock=time.time):
+        self._root = root
+        self._is_frozen = is_frozen
+        self._fetcher = fetcher or yf_history_range
+        self._min_refresh = min_refresh
+        self._clock = clock
+        self._ext = 'parquet' if _parquet_available() else 'pkl'
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _base(self, symbol, interval):
+        return os.path.join(self._root, f"{symbol.replace('/', '_')}__{interval}")
+
+    def _read(self, symbol, interval):
+        base = self._base(symbol, interval)
+        try:
+            with open(base + '.json', encoding='utf-8') as f:
+                meta = json.load(f)
+            if self._ext == 'parquet':
+                df = pd.read_parquet(f"{base}.{self._ext}")
+            else:
+                df = pd.read_pickle(f"{base}.{self._ext}")
+        except (OSError, ValueError, KeyError):
+            return None, None
+        return df, meta
+
+    def _write(self, symbol, interval, df, meta):
+        base = self._base(symbol, interval)
+        tmp = f"{base}.tmp.{self._ext}"
+        if self._ext == 'parquet':
+            df.to_parquet(tmp)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, f"{base}.{self._ext}")
+        with open(base + '.json.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(base + '.json.tmp', base + '.json')
+
+    def load(self, symbol, interval):
+        """Renvoie l'historique stocké (index UTC) ou None"""
+        return self._read(symbol, interval)[0]
+
+    def get_history(self, symbol, period, interval, timeout=10):
+        """Renvoie l'historique de la période demandée en ne téléchargeant que ce qui manque"""
+        with self._lock((symbol, interval)):
+            df, meta = self._read(symbol, interval)
+            now = self._clock()
+            covered = meta is not None and PERIODS.index(meta['covered']) >= PERIODS.index(period)
+
+            if df is None or df.empty or not covered:
+                fresh = self._fetcher(symbol, interval, period=period, timeout=timeout)
+                if fresh is None or fresh.empty:
+                    return slice_period(df, period) if covered else fresh
+                fresh = to_utc_index(fresh)
+                df = fresh if df is None or df.empty else self._merge(df, fresh)
+                meta = {'covered': period if not meta else max(meta['covered'], period, key=PERIODS.index),
+                        'fetched_at': now}
+                self._write(symbol, interval, df, meta)
+
+            elif now - meta['fetched_at'] >= self._min_refresh and not (
+                    self._is_frozen and self._is_frozen(symbol, meta['fetched_at'])):
+                # Stock plus ancien que la profondeur intraday de Yahoo : la période entière est retéléchargée
+                lookback = INTRADAY_LOOKBACK.get(interval)
+                gap_too_long = lookback is not None and (
+                    pd.Timestamp(now, unit='s', tz='UTC') - df.index[-1] >= lookback)
+                try:
+                    if gap_too_long:
+                        new = self._fetcher(symbol, interval, period=meta['covered'], timeout=timeout)
+                    else:
+                        # Seulement les barres à partir du dernier horodatage (la dernière peut être en cours)
+                        new = self._fetcher(symbol, interval, start=df.index[-1], timeout=timeout)
+                except Exception as e:
+                    if not is_rate_limited(e):
+                        raise
+                    # Limite atteinte : l'historique stocké fait foi jusqu'à la fin du refroidissement
+                    return slice_period(df, period)
+                # Rien reçu : ``fetched_at`` reste inchangé pour réessayer au prochain appel
+                if new is None or new.empty:
+                    return slice_period(df, period)
+                new = to_utc_index(new)
+                df = new if gap_too_long else self._merge(df, new)
+                meta['fetched_at'] = now
+                self._write(symbol, interval, df, meta)
+
+            return slice_period(df, period)
+
+    @staticmethod
+    def _merge(old, new):
+        merged = pd.concat([old, new])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        return merged.sort_index()
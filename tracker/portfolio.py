@@ -0,0 +1,129 @@
+"""Portefeuille virtuel en colonnes : valorisation et P&L vectorisés"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def currency_for(symbol):
+    """KRW pour .KS/.KQ, USD sinon"""
+    return 'KRW' if symbol.endswith(('.KS', '.KQ')) else 'USD'
+
+
+class Portfolio:
+    """Positions stockées en tableaux parallèles (symbole, quantité, prix de revient, devise)
+
+    La valorisation et les séries de rendement se font en une passe vectorisée
+    sur ces colonnes, quelle que soit la taille du portefeuille.
+    """
+
+    def __init__(self):
+        self.symbols = np.empty(0, dtype=object)
+        self.quantity = np.empty(0, dtype=float)
+        self.cost_basis = np.empty(0, dtype=float)
+        self.currency = np.empty(0, dtype=object)
+        self.realized = np.empty(0, dtype=float)
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.quantity))
+
+    def _row(self, symbol):
+        row = self._rows.get(symbol)
+        if row is None:
+            row = len(self.symbols)
+            self._rows[symbol] = row
+            self.symbols = np.append(self.symbols, symbol)
+            self.quantity = np.append(self.quantity, 0.0)
+            self.cost_basis = np.append(self.cost_basis, 0.0)
+            self.currency = np.append(self.currency, currency_for(symbol))
+            self.realized = np.append(self.realized, 0.0)
+        return row
+
+    def buy(self, symbol, quantity, price):
+        """Achat : le prix de revient devient la moyenne pondérée"""
+        if quantity <= 0 or price <= 0:
+            raise ValueError("Quantité et prix doivent être positifs")
+        with self._lock:
+            row = self._row(symbol)
+            held = self.quantity[row]
+            self.cost_basis[row] = (held * self.cost_basis[row] + quantity * price) / (held + quantity)
+            self.quantity[row] = held + quantity
+
+    def sell(self, symbol, quantity, price):
+        """Vente : réalise le P&L sur la base du prix de revient moyen"""
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None or quantity <= 0 or quantity > self.quantity[row]:
+                raise ValueError(f"Quantité insuffisante pour {symbol}")
+            self.realized[row] += (price - self.cost_basis[row]) * quantity
+            self.quantity[row] -= quantity
+            if self.quantity[row] == 0:
+                self.cost_basis[row] = 0.0
+
+    def held(self):
+        """Masque des lignes avec une position ouverte"""
+        return self.quantity > 0
+
+    def fx_vector(self, fx_rates, base='KRW'):
+        """Taux de conversion vers la devise de base pour chaque ligne"""
+        rates = {base: 1.0, **fx_rates}
+        return np.array([rates[c] for c in self.currency], dtype=float)
+
+    def valuation(self, prices, fx_rates, base='KRW'):
+        """Valorise tout le portefeuille contre un lot de derniers prix
+
+        ``prices`` : Series ou dict symbole -> prix ; ``fx_rates`` : devise -> taux vers ``base``.
+        """
+        prices = pd.Series(prices, dtype=float).reindex(self.symbols).to_numpy()
+        fx = self.fx_vector(fx_rates, base)
+        qty, cost = self.quantity, self.cost_basis
+
+        market_value = qty * prices * fx
+        cost_value = qty * cost * fx
+        unrealized = market_value - cost_value
+        total = np.nansum(market_value)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frame = pd.DataFrame({
+                'symbol': self.symbols,
+                'currency': self.currency,
+                'quantity': qty,
+                'cost_basis': cost,
+                'price': prices,
+                'market_value': market_value,
+                'cost_value': cost_value,
+                'unrealized_pnl': unrealized,
+                'unrealized_pct': np.where(cost_value > 0, unrealized / cost_value * 100, np.nan),
+                'realized_pnl': self.realized * fx,
+                'weight': market_value / total * 100 if total else np.nan,
+            })
+        keep = self.held() | (self.realized != 0)
+        return frame[keep].reset_index(drop=True)
+
+    def value_series(self, closes, fx_rates, base='KRW'):
+        """Valeur quotidienne du portefeuille (positions actuelles) à partir d'une matrice de clôtures
+
+        ``closes`` : DataFrame dates x symboles ; ``fx_rates`` : devise -> taux ou Series datée.
+        """
+        held = self.held()
+        symbols = self.symbols[held]
+        if not len(symbols):
+            return pd.Series(dtype=float)
+        prices = closes.reindex(columns=symbols).ffill()
+        fx = pd.DataFrame(1.0, index=prices.index, columns=symbols)
+        for currency, rate in fx_rates.items():
+            cols = symbols[self.currency[held] == currency]
+            if len(cols) == 0:
+                continue
+            if isinstance(rate, pd.Series):
+                rate = rate.reindex(prices.index).ffill().bfill()
+                fx[cols] = np.repeat(rate.to_numpy()[:, None], len(cols), axis=1)
+            else:
+                fx[cols] = rate
+        values = (prices.to_numpy() * fx.to_numpy()) @ self.quantity[held]
+        return pd.Series(values, index=prices.index, name='value').dropna()
+
+    def daily_returns(self, closes, fx_rates, base='KRW'):
+        """Rendements quotidiens du portefeuille"""
+        return self.value_series(closes, fx_rates, base).pct_change().dropna()
@@ -0,0 +1,165 @@
+"""Hub de prix du processus : un instantané par symbole, partagé par toutes les sessions"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from tracker.governor import is_rate_limited
+from tracker.quotes import DOWNLOAD_BATCH, QUOTE_COLUMNS, extract_last_quotes, yf_batch_download
+
+
+class _Flight:
+    """Téléchargement en cours pour un lot de symboles ; les autres demandeurs l'attendent"""
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self.done = threading.Event()
+        self.error = None
+
+
+class PriceHub:
+    """Cotations mises en mémoire par symbole, avec abonnements et requêtes fusionnées
+
+    Contrairement à ``WatchlistQuoteEngine`` (cache par ensemble de symboles), deux
+    sessions dont les listes se recouvrent partagent les mêmes entrées. Un symbole
+    déjà en cours de téléchargement n'est jamais redemandé : les appelants
+    concurrents attendent le même lot (single-flight). Quand un téléchargement est
+    nécessaire, il inclut aussi (après ceux de l'appelant) les symboles périmés
+    auxquels d'autres sessions sont abonnées, si bien qu'un appel amont sert tous
+    les spectateurs.
+
+    Si le téléchargement est refusé pour limite de requêtes (429, disjoncteur du
+    gouverneur), les cotations en mémoire sont servies périmées (NaN pour les
+    symboles jamais reçus) plutôt que de lever. Les symboles sont téléchargés par
+    lots de ``batch_size`` et mémorisés au fil de l'eau ; un téléchargement
+    s'arrête au lot qui dépasse ``fetch_budget`` secondes. Une longue watchlist se
+    remplit ainsi progressivement, d'appel en appel, sans bloquer le rerun.
+
+    ``ttl`` peut être une fonction ``ttl(symbols) -> secondes``. Le téléchargeur
+    (``downloader(symbols, period) -> DataFrame``) est injectable pour les tests hors ligne.
+    """
+
+    def __init__(self, downloader=None, ttl=60, lease=300, period='5d', batch_size=DOWNLOAD_BATCH,
+                 fetch_budget=2.0, clock=time.monotonic):
+        self._downloader = downloader or yf_batch_download
+        self._batch_size = batch_size
+        self._fetch_budget = fetch_budget
+        self._ttl = ttl
+        self._lease = lease
+        self._period = period
+        self._clock = clock
+        self._entries = {}
+        self._inflight = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    def subscribe(self, subscriber_id, symbols):
+        """Déclare (ou renouvelle pour ``lease`` secondes) les symboles affichés par une session"""
+        with self._lock:
+            self._subscribers[subscriber_id] = (frozenset(symbols), self._clock() + self._lease)
+
+    def unsubscribe(self, subscriber_id):
+        with self._lock:
+            self._subscribers.pop(subscriber_id, None)
+
+    def subscribed(self):
+        """Union des symboles des abonnements encore valides"""
+        with self._lock:
+            return self._subscribed(self._clock())
+
+    def _subscribed(self, now):
+        expired = [k for k, (_, expires) in self._subscribers.items() if expires <= now]
+        for k in expired:
+            del self._subscribers[k]
+        return frozenset().union(*(symbols for symbols, _ in self._subscribers.values()))
+
+    def _fresh(self, symbol, now):
+        entry = self._entries.get(symbol)
+        return entry is not None and entry[0] > now
+
+    def get_quotes(self, symbols):
+        """DataFrame (index = symbole) avec price, prev_close et change_pct, servi depuis la mémoire"""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return pd.DataFrame(columns=QUOTE_COLUMNS, dtype=float)
+
+        now = self._clock()
+        flight = None
+        with self._lock:
+            stale = [s for s in symbols if not self._fresh(s, now)]
+            self.hits += len(symbols) - len(stale)
+            self.misses += len(stale)
+            waiting = {self._inflight[s] for s in stale if s in self._inflight}
+            self.coalesced += sum(1 for s in stale if s in self._inflight)
+            missing = [s for s in stale if s not in self._inflight]
+            if missing:
+                extra = [s for s in self._subscribed(now)
+                         if s not in self._inflight and not self._fresh(s, now)]
+                # Symboles demandés d'abord : le budget de téléchargement ne coupe que les abonnements des autres
+                flight = _Flight(missing + sorted(set(extra) - set(missing)))
+                for s in flight.symbols:
+                    self._inflight[s] = flight
+
+        try:
+            if flight is not None:
+                self._fetch(flight)
+            for other in waiting:
+                other.done.wait()
+                if other.error is not None:
+                    raise other.error
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            with self._lock:
+                self.stale_served += 1
+
+        with self._lock:
+            rows = {s: self._entries[s][1] if s in self._entries else (np.nan, np.nan, np.nan) for s in symbols}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=QUOTE_COLUMNS).reindex(symbols)
+
+    def _fetch(self, flight):
+        deadline = self._clock() + self._fetch_budget
+        try:
+            for start in range(0, len(flight.symbols), self._batch_size):
+                if start and self._clock() >= deadline:
+                    break
+                batch = flight.symbols[start:start + self._batch_size]
+                quotes = extract_last_quotes(self._downloader(batch, self._period), batch)
+                ttl = self._ttl(batch) if callable(self._ttl) else self._ttl
+                expires = self._clock() + ttl
+                with self._lock:
+                    self.fetches += 1
+                    for symbol, row in quotes[QUOTE_COLUMNS].iterrows():
+                        self._entries[symbol] = (expires, tuple(row))
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                for s in flight.symbols:
+                    if self._inflight.get(s) is flight:
+                        del self._inflight[s]
+            flight.done.set()
+
+    def invalidate(self):
+        """Oublie les cotations en mémoire (les abonnements sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'symbols': len(self._entries),
+                'subscribers': len(self._subscribers),
+                'hits': self.hits,
+                'misses': self.misses,
+                'fetches': self.fetches,
+                'coalesced': self.coalesced,
+                'stale_served': self.stale_served,
+            }
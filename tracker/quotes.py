@@ -0,0 +1,150 @@
+"""Moteur de cotations groupées pour la watchlist"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from tracker.governor import GOVERNOR, RateLimitError
+from tracker.metrics import count_upstream
+
+QUOTE_COLUMNS = ['price', 'prev_close', 'change_pct']
+
+# Symboles par appel yf.download : un lot coûte au plus ce nombre de jetons au gouverneur,
+# si bien qu'une longue watchlist ne met jamais le seau assez en négatif pour affamer la file interactive
+DOWNLOAD_BATCH = 5
+
+
+def yf_batch_download(symbols, period):
+    """Télécharge l'historique journalier de plusieurs symboles, par lots de ``DOWNLOAD_BATCH``
+
+    File ``background`` par défaut (rafraîchissement de la watchlist) ; yfinance
+    émet une requête HTTP par symbole, d'où un coût d'un jeton par symbole.
+
+    Si le gouverneur refuse un lot, les lots déjà reçus sont renvoyés et les
+    symboles non téléchargés sont listés dans ``attrs['failed']`` ; l'erreur
+    n'est propagée que si aucun lot n'a abouti.
+    """
+    import yfinance as yf
+
+    symbols = list(symbols)
+    frames = []
+    failed = []
+    for start in range(0, len(symbols), DOWNLOAD_BATCH):
+        batch = symbols[start:start + DOWNLOAD_BATCH]
+        try:
+            with GOVERNOR.request('download', lane='background', cost=len(batch)):
+                count_upstream('download')
+                raw = yf.download(
+                    tickers=batch,
+                    period=period,
+                    interval='1d',
+                    group_by='ticker',
+                    auto_adjust=False,
+                    progress=False,
+                    threads=True,
+                )
+        except RateLimitError:
+            if start == 0:
+                raise
+            # Les lots suivants seraient refusés de même : on rend ce qui a été reçu
+            failed = symbols[start:]
+            break
+        if raw is not None and not raw.empty and not isinstance(raw.columns, pd.MultiIndex):
+            raw = pd.concat({batch[0]: raw}, axis=1)
+        frames.append(raw)
+    frames = [f for f in frames if f is not None and not f.empty]
+    result = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+    result.attrs['failed'] = failed
+    return result
+
+
+def close_matrix(raw, symbols):
+    """Extrait les clôtures (dates x symboles) d'un téléchargement multi-tickers"""
+    if raw is None or raw.empty:
+        return pd.DataFrame(columns=list(symbols), dtype=float)
+
+    if isinstance(raw.columns, pd.MultiIndex):
+        # group_by='ticker' -> colonnes (symbole, champ)
+        level = 1 if 'Close' in raw.columns.get_level_values(1) else 0
+        closes = raw.xs('Close', axis=1, level=level)
+    else:
+        # Un seul symbole sans MultiIndex
+        closes = raw[['Close']].rename(columns={'Close': symbols[0]})
+
+    return closes.reindex(columns=list(symbols)).astype(float)
+
+
+def extract_last_quotes(raw, symbols):
+    """Construit le tableau dernier prix / clôture précédente à partir du téléchargement groupé"""
+    symbols = list(symbols)
+    closes = close_matrix(raw, symbols)
+
+    rows = {}
+    for sym in symbols:
+        series = closes[sym].dropna() if sym in closes else pd.Series(dtype=float)
+        if series.empty:
+            rows[sym] = (np.nan, np.nan)
+            continue
+        price = series.iloc[-1]
+        prev_close = series.iloc[-2] if len(series) > 1 else price
+        rows[sym] = (price, prev_close)
+
+    quotes = pd.DataFrame.from_dict(rows, orient='index', columns=['price', 'prev_close'])
+    quotes['change_pct'] = (quotes['price'] - quotes['prev_close']) / quotes['prev_close'] * 100
+    return quotes.reindex(symbols)[QUOTE_COLUMNS]
+
+
+class WatchlistQuoteEngine:
+    """Récupère les cotations de toute la watchlist en un seul appel, avec cache TTL partagé
+
+    Le cache est indexé par (ensemble de symboles, période) : tous les onglets et
+    toutes les sessions qui affichent la même watchlist partagent le même résultat.
+    Le téléchargeur est injectable (``downloader(symbols, period) -> DataFrame``)
+    pour pouvoir utiliser le moteur hors ligne. ``ttl`` peut être une fonction
+    ``ttl(symbols) -> secondes`` (par exemple selon l'ouverture des marchés).
+    """
+
+    def __init__(self, downloader=None, ttl=60, clock=time.monotonic):
+        self._downloader = downloader or yf_batch_download
+        self._ttl = ttl
+        self._clock = clock
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_quotes(self, symbols, period='5d'):
+        """Renvoie un DataFrame (index = symbole) avec price, prev_close et change_pct"""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return pd.DataFrame(columns=QUOTE_COLUMNS, dtype=float)
+
+        key = (frozenset(symbols), period)
+        now = self._clock()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                return cached[1].reindex(symbols)
+            self.misses += 1
+
+            raw = self._downloader(sorted(key[0]), period)
+            quotes = extract_last_quotes(raw, sorted(key[0]))
+            # Téléchargement partiel (gouverneur) : rien en cache, le prochain appel complète
+            if raw is None or not raw.attrs.get('failed'):
+                ttl = self._ttl(symbols) if callable(self._ttl) else self._ttl
+                self._cache[key] = (now + ttl, quotes)
+            self._purge(now)
+
+        return quotes.reindex(symbols)
+
+    def invalidate(self):
+        """Vide le cache des cotations"""
+        with self._lock:
+            self._cache.clear()
+
+    def _purge(self, now):
+        expired = [k for k, (expires, _) in self._cache.items() if expires <= now]
+        for k in expired:
+            del self._cache[k]
@@ -0,0 +1,110 @@
+"""Planificateur d'actualisation en arrière-plan, partagé par toutes les sessions"""
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+
+@dataclass
+class Snapshot:
+    """Cotations publiées par le planificateur"""
+    version: int = 0
+    updated_at: float = None
+    quotes: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+class RefreshScheduler:
+    """Interroge les prix à sa propre cadence et publie des instantanés
+
+    Les sessions s'abonnent à des symboles avec un bail (renouvelé à chaque
+    affichage) ; un seul thread interroge l'union des symboles abonnés, une fois
+    par cycle, quel que soit le nombre de spectateurs. La cadence est la plus
+    courte demandée par les abonnés actifs, sans descendre sous ``min_interval`` ;
+    une ``policy`` (voir ``market_calendar.RefreshPolicy``) peut l'allonger quand
+    les marchés concernés sont fermés.
+    """
+
+    def __init__(self, fetch_quotes, min_interval=30, default_interval=60, lease_factor=3,
+                 policy=None, clock=time.monotonic):
+        self._fetch_quotes = fetch_quotes
+        self._policy = policy
+        self._min_interval = min_interval
+        self._default_interval = default_interval
+        self._lease_factor = lease_factor
+        self._clock = clock
+        self._subscribers = {}
+        self._snapshot = Snapshot()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.errors = 0
+
+    def subscribe(self, subscriber_id, symbols, interval=None):
+        """Enregistre (ou renouvelle) l'intérêt d'une session pour des symboles"""
+        interval = max(interval or self._default_interval, self._min_interval)
+        expires = self._clock() + interval * self._lease_factor
+        with self._lock:
+            previous = self._subscribers.get(subscriber_id)
+            self._subscribers[subscriber_id] = (frozenset(symbols), interval, expires)
+            missing = not set(symbols) <= set(self._snapshot.quotes.index)
+        if previous is None or missing:
+            self._wakeup.set()
+        self._ensure_started()
+
+    def unsubscribe(self, subscriber_id):
+        with self._lock:
+            self._subscribers.pop(subscriber_id, None)
+
+    def snapshot(self):
+        """Dernier instantané publié"""
+        with self._lock:
+            return self._snapshot
+
+    def _active(self):
+        now = self._clock()
+        with self._lock:
+            expired = [k for k, (_, _, exp) in self._subscribers.items() if exp <= now]
+            for k in expired:
+                del self._subscribers[k]
+            if not self._subscribers:
+                return frozenset(), self._default_interval
+            symbols = frozenset().union(*(syms for syms, _, _ in self._subscribers.values()))
+            cadence = min(interval for _, interval, _ in self._subscribers.values())
+        if self._policy is not None:
+            cadence = self._policy.poll_interval(symbols, cadence)
+        return symbols, cadence
+
+    def poll_once(self):
+        """Exécute un cycle d'interrogation ; renvoie la cadence du prochain cycle"""
+        symbols, cadence = self._active()
+        if not symbols:
+            return cadence
+        try:
+            quotes = self._fetch_quotes(sorted(symbols))
+        except Exception:
+            self.errors += 1
+            return cadence
+        self.polls += 1
+        with self._lock:
+            self._snapshot = Snapshot(self._snapshot.version + 1, time.time(), quotes)
+        return cadence
+
+    def _run(self):
+        while not self._stop.is_set():
+            cadence = self.poll_once()
+            self._wakeup.wait(timeout=cadence)
+            self._wakeup.clear()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
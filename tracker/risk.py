@@ -0,0 +1,91 @@
+"""Corrélations et mesures de risque sur l'ensemble de la watchlist"""
+import numpy as np
+import pandas as pd
+
+from tracker.market_calendar import KOREA_TIMEZONE, is_trading_day
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def krx_calendar(start, end):
+    """Jours de bourse KRX entre deux dates (incluses)"""
+    days = pd.date_range(start, end, freq='D')
+    return pd.DatetimeIndex([d for d in days if is_trading_day('KRX', d.date())])
+
+
+def _kst_dates(index):
+    if index.tz is not None:
+        index = index.tz_convert(KOREA_TIMEZONE).tz_localize(None)
+    return index.normalize()
+
+
+def align_closes(closes):
+    """Aligne des clôtures (dates x symboles, fuseaux mixtes) sur le calendrier de séances KRX
+
+    Chaque série est ramenée à sa date KST puis reportée (dernière valeur connue)
+    sur les jours de bourse coréens ; les ADR cotés à New York prennent donc leur
+    dernière clôture disponible à la date de la séance de Séoul.
+    """
+    if closes.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([]), columns=closes.columns, dtype=float)
+    frame = closes.copy()
+    frame.index = _kst_dates(frame.index)
+    frame = frame.groupby(level=0).last().sort_index()
+    calendar = krx_calendar(frame.index[0], frame.index[-1])
+    return frame.reindex(frame.index.union(calendar)).ffill().reindex(calendar)
+
+
+def log_returns(aligned):
+    """Matrice des rendements logarithmiques (premier jour retiré)"""
+    return np.log(aligned).diff().iloc[1:]
+
+
+def correlation_matrix(returns, window):
+    """Corrélations sur les ``window`` dernières séances (calcul NumPy sur la matrice standardisée)"""
+    tail = returns.iloc[-window:].dropna(axis=1, how='all')
+    values = tail.to_numpy()
+    mask = ~np.isnan(values)
+    filled = np.where(mask, values, 0.0)
+    counts = mask.sum(axis=0)
+    means = filled.sum(axis=0) / np.maximum(counts, 1)
+    centered = np.where(mask, values - means, 0.0)
+    cov = centered.T @ centered
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.outer(std, std)
+    return pd.DataFrame(corr, index=tail.columns, columns=tail.columns)
+
+
+def rolling_beta(returns, benchmark, window):
+    """Bêta glissant de chaque colonne contre l'indice de référence"""
+    bench = returns[benchmark]
+    others = returns.drop(columns=[benchmark])
+    cov = others.rolling(window).cov(bench)
+    var = bench.rolling(window).var()
+    return cov.div(var, axis=0)
+
+
+def rolling_volatility(returns, window):
+    """Volatilité annualisée glissante"""
+    return returns.rolling(window).std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def drawdowns(aligned):
+    """Baisse depuis le plus haut précédent, pour chaque symbole"""
+    return aligned / aligned.cummax() - 1
+
+
+def risk_summary(aligned, returns, benchmark, window):
+    """Tableau récapitulatif : bêta, volatilité, corrélation à l'indice, drawdowns"""
+    dd = drawdowns(aligned)
+    beta = rolling_beta(returns, benchmark, window).iloc[-1]
+    corr = correlation_matrix(returns, window)
+    summary = pd.DataFrame({
+        'beta': beta,
+        'volatility_pct': rolling_volatility(returns, window).iloc[-1] * 100,
+        'corr_index': corr[benchmark] if benchmark in corr else np.nan,
+        'max_drawdown_pct': dd.min() * 100,
+        'current_drawdown_pct': dd.iloc[-1] * 100,
+    })
+    summary.loc[benchmark, 'beta'] = 1.0
+    return summary
@@ -0,0 +1,83 @@
+"""Horodatages UTC figés à l'ingestion et vues par fuseau construites à la demande
+
+Les historiques circulent avec un index UTC ; seules les valeurs réellement
+affichées (points réduits du graphique, dernière barre, horloges) sont converties
+dans le fuseau d'affichage choisi par l'utilisateur.
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+# Fuseaux proposés pour l'affichage (nom IANA -> libellé)
+DISPLAY_TIMEZONES = {
+    'Europe/Paris': '🇫🇷 Paris',
+    'Asia/Seoul': '🇰🇷 Séoul (KST)',
+    'America/New_York': '🇺🇸 New York',
+    'UTC': '🌐 UTC',
+}
+
+# Horloges du bandeau
+CLOCK_ZONES = ('Europe/Paris', 'Asia/Seoul', 'America/New_York')
+
+NANOS_PER_DAY = 86_400 * 10**9
+
+
+def utc_nanos(index):
+    """Horodatages epoch UTC en int64 (ns) ; un index naïf est considéré comme UTC"""
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.as_unit('ns').asi8
+
+
+def world_clock(zones=CLOCK_ZONES, now=None):
+    """Heure courante dans plusieurs fuseaux à partir d'une seule lecture de l'horloge"""
+    instant = datetime.fromtimestamp(time.time() if now is None else now, pytz.utc)
+    return {zone: instant.astimezone(pytz.timezone(zone)) for zone in zones}
+
+
+class ZonedIndex:
+    """Index UTC int64 d'un historique, avec vues locales construites une fois par fuseau"""
+
+    def __init__(self, index):
+        self.nanos = utc_nanos(index)
+        self._views = {}
+        self._days = {}
+
+    def __len__(self):
+        return len(self.nanos)
+
+    def view(self, tz):
+        """DatetimeIndex dans le fuseau ``tz`` (mis en cache)"""
+        key = str(tz)
+        if key not in self._views:
+            self._views[key] = pd.DatetimeIndex(self.nanos, tz='UTC').tz_convert(key)
+        return self._views[key]
+
+    def local_days(self, tz):
+        """Numéro de jour local (jours depuis 1970) de chaque barre, pour filtrer par date sans objets ``date``"""
+        key = str(tz)
+        if key not in self._days:
+            local = self.view(key).tz_localize(None).as_unit('ns').asi8
+            self._days[key] = local // NANOS_PER_DAY
+        return self._days[key]
+
+
+def day_to_date(day):
+    return (np.datetime64(0, 'D') + np.timedelta64(int(day), 'D')).astype(object)
+
+
+def date_to_day(value):
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+def display_index(index, tz, intraday=True, exchange_tz=None):
+    """Index prêt pour l'affichage : heure locale en intraday, date de séance au-delà"""
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    if intraday:
+        return index.tz_convert(tz)
+    # Barres journalières : la date de la séance dans le fuseau de la bourse, sans heure
+    return index.tz_convert(exchange_tz or tz).tz_localize(None).normalize()